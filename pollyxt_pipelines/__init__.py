@@ -3,56 +3,56 @@ Entry point for the application, mainly contains cleo setup
 Author: Thanasis Georgiou <ageorgiou@noa.gr>
 """
 
-import importlib
-import importlib.metadata
-
-from cleo import Application
-
-from pollyxt_pipelines.radiosondes.commands import GetRadiosonde
-from pollyxt_pipelines.polly_to_scc.commands import CreateSCC
-from pollyxt_pipelines.config import ConfigCommand
-from pollyxt_pipelines.scc_access.commands import (
-    AutoUploadCalibration,
-    DeleteSCC,
-    DownloadFiles,
-    Login,
-    RerunSCC,
-    SearchDownloadSCC,
-    SearchSCC,
-    UploadFiles,
-    LidarConstantsSCC,
+from importlib import import_module
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from cleo import Application
+
+__version__ = "1.16.0"
+"""Package version, keep in sync with `pyproject.toml`"""
+
+COMMANDS = (
+    ("pollyxt_pipelines.radiosondes.commands", "GetRadiosonde"),
+    ("pollyxt_pipelines.polly_to_scc.commands", "CreateSCC"),
+    ("pollyxt_pipelines.config", "ConfigCommand"),
+    ("pollyxt_pipelines.scc_access.commands", "Login"),
+    ("pollyxt_pipelines.scc_access.commands", "UploadFiles"),
+    ("pollyxt_pipelines.scc_access.commands", "DownloadFiles"),
+    ("pollyxt_pipelines.scc_access.commands", "DeleteSCC"),
+    ("pollyxt_pipelines.scc_access.commands", "RerunSCC"),
+    ("pollyxt_pipelines.scc_access.commands", "SearchSCC"),
+    ("pollyxt_pipelines.scc_access.commands", "SearchDownloadSCC"),
+    ("pollyxt_pipelines.scc_access.commands", "LidarConstantsSCC"),
+    ("pollyxt_pipelines.locations.commands", "ShowLocations"),
+    ("pollyxt_pipelines.locations.commands", "LocationPath"),
+    ("pollyxt_pipelines.qc_eldec.commands", "QCEldec"),
+    ("pollyxt_pipelines.qc_eldec.commands", "QCEldecDeleteHistory"),
+    ("pollyxt_pipelines.scc_access.commands", "AutoUploadCalibration"),
 )
-from pollyxt_pipelines.locations.commands import LocationPath, ShowLocations
-from pollyxt_pipelines.qc_eldec.commands import QCEldec, QCEldecDeleteHistory
+"""
+Commands of the CLI application as (module, class name) pairs. The modules are only
+imported when the application is created, so importing `pollyxt_pipelines` as a
+library does not pull in every command and its dependencies.
+"""
 
 
 def get_package_version():
     """Returns the package version."""
-    return importlib.metadata.version("pollyxt_pipelines")
+    return __version__
 
 
-def prepare_cli_application() -> Application:
+def prepare_cli_application() -> "Application":
     """
     Entry point, setup the cleo Application and add all commands
     """
 
+    from cleo import Application
+
     application = Application("pollyxt_pipelines", get_package_version())
-    application.add(GetRadiosonde())
-    application.add(CreateSCC())
-    application.add(ConfigCommand())
-    application.add(Login())
-    application.add(UploadFiles())
-    application.add(DownloadFiles())
-    application.add(DeleteSCC())
-    application.add(RerunSCC())
-    application.add(SearchSCC())
-    application.add(SearchDownloadSCC())
-    application.add(LidarConstantsSCC())
-    application.add(ShowLocations())
-    application.add(LocationPath())
-    application.add(QCEldec())
-    application.add(QCEldecDeleteHistory())
-    application.add(AutoUploadCalibration())
+    for module_name, class_name in COMMANDS:
+        command = getattr(import_module(module_name), class_name)
+        application.add(command())
 
     return application
 
@@ -5,46 +5,86 @@ Import the `Config` function to use it.
 
 import os.path
 from configparser import ConfigParser
+from functools import lru_cache
 from pathlib import Path
-from typing import List
+from typing import List, Optional, Tuple
 import platform
+import threading
 
 from cleo import Command
 
-from pollyxt_pipelines.console import console
 
-
-def config_paths() -> List[str]:
+@lru_cache(maxsize=None)
+def config_paths() -> Tuple[Path, ...]:
     """
     Returns the config directory paths for each platform.
     The last one returned is the user config path and should be
     used for writing.
+
+    The result is computed once per process.
     """
 
     os_name = platform.system()
     if os_name == "Windows":
         path = os.path.expandvars("%APPDATA%/PollyXT_Pipelines/")
-        paths = [Path(path)]
+        paths = (Path(path),)
     elif os_name == "Linux":
-        paths = [
+        paths = (
             Path("/etc/pollyxt_pipelines/"),
             Path("~/.config/pollyxt_pipelines/").expanduser(),
-        ]
+        )
     else:
         print("Unknown operating system! Using `./` as config directory!")
-        paths = [Path("./").expanduser()]
+        paths = (Path("./").expanduser(),)
     return paths
 
 
+def _modification_times(paths: List[Path]) -> Tuple[Optional[int], ...]:
+    """
+    Returns the modification time of each file, or `None` for files that can't be read
+    """
+
+    mtimes = []
+    for path in paths:
+        try:
+            mtimes.append(path.stat().st_mtime_ns)
+        except OSError:
+            mtimes.append(None)
+    return tuple(mtimes)
+
+
+_parser_cache: Optional[Tuple[tuple, ConfigParser]] = None
+"""The last parsed config, keyed by the paths and modification times of its files"""
+
+_parser_cache_lock = threading.Lock()
+
+
 class Config:
     """
     Represents the application config. Can be used to read and write from config files.
+
+    The config files are parsed once per process and shared between `Config` objects,
+    unless they are modified on disk.
     """
 
     def __init__(self):
+        global _parser_cache
+
         self.paths = [path / "pollyxt_pipelines.ini" for path in config_paths()]
-        self.parser = ConfigParser()
-        self.parser.read(self.paths)
+
+        mtimes = _modification_times(self.paths)
+        key = (tuple(self.paths), mtimes)
+        with _parser_cache_lock:
+            if _parser_cache is not None and _parser_cache[0] == key:
+                self.parser = _parser_cache[1]
+            else:
+                # Files without a modification time could not be stat'ed, skip opening them
+                existing_paths = [
+                    path for path, mtime in zip(self.paths, mtimes) if mtime is not None
+                ]
+                self.parser = ConfigParser()
+                self.parser.read(existing_paths)
+                _parser_cache = (key, self.parser)
 
     def __getitem__(self, name) -> str:
         if name not in self.parser:
@@ -58,9 +98,15 @@ class Config:
 
     def write(self):
         """Write config to disk, persisting any changes"""
-        Path(self.paths[-1]).parent.mkdir(exist_ok=True, parents=True)
-        with open(self.paths[-1], "w") as file:
-            self.parser.write(file)
+        global _parser_cache
+
+        self.paths[-1].parent.mkdir(exist_ok=True, parents=True)
+        with _parser_cache_lock:
+            with open(self.paths[-1], "w") as file:
+                self.parser.write(file)
+
+            key = (tuple(self.paths), _modification_times(self.paths))
+            _parser_cache = (key, self.parser)
 
 
 class ConfigCommand(Command):
@@ -73,6 +119,8 @@ class ConfigCommand(Command):
     """
 
     def handle(self):
+        from pollyxt_pipelines.console import console
+
         # Parse arguments
         try:
             group, name = self.argument("name").split(".")
@@ -107,6 +155,8 @@ def print_login_error():
     Use this to print an error when the user needs to login.
     """
 
+    from pollyxt_pipelines.console import console
+
     console.print("[error]Credentials not found in config![/error]")
     console.print(
         "Use `pollyxt_pipelines login` to provide your SCC credentials and run this command again."
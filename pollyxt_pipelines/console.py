@@ -1,9 +1,22 @@
 """
 Console singleton for printing throught the app
+
+The console is created on first access, so importing this module does not initialize `rich`.
 """
 
-from rich.console import Console
-from rich.theme import Theme
 
-console_theme = Theme({"info": "cyan", "warn": "yellow", "error": "bold red"})
-console = Console(theme=console_theme)
+def __getattr__(name: str):
+    if name == "console_theme":
+        from rich.theme import Theme
+
+        value = Theme({"info": "cyan", "warn": "yellow", "error": "bold red"})
+    elif name == "console":
+        from rich.console import Console
+
+        value = Console(theme=__getattr__("console_theme"))
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    # Store in module globals so this function is not called again for the same name
+    globals()[name] = value
+    return value
@@ -22,13 +22,16 @@ class Atmosphere(IntEnum):
     @staticmethod
     def from_string(x: str):
         x = x.lower().strip()
-        if x == "automatic":
-            return Atmosphere.AUTOMATIC
-        if x == "radiosonde":
-            return Atmosphere.RADIOSONDE
-        if x == "cloudnet":
-            return Atmosphere.CLOUDNET
-        if x == "standard":
-            return Atmosphere.STANDARD_ATMOSPHERE
-
-        raise ValueError(f"Unknown atmosphere {x}")
+        try:
+            return _ATMOSPHERE_NAMES[x]
+        except KeyError:
+            raise ValueError(f"Unknown atmosphere {x}") from None
+
+
+_ATMOSPHERE_NAMES = {
+    "automatic": Atmosphere.AUTOMATIC,
+    "radiosonde": Atmosphere.RADIOSONDE,
+    "cloudnet": Atmosphere.CLOUDNET,
+    "standard": Atmosphere.STANDARD_ATMOSPHERE,
+}
+"""Names accepted by `Atmosphere.from_string()`"""
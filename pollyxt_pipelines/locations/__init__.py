@@ -5,23 +5,25 @@ Each location (i.e. SCC station) is defined in an .ini file. For some stations,
 the .ini files are included with the software but custom locations can be defined.
 """
 
-import io
 import sys
-import re
 from configparser import ConfigParser, SectionProxy
-from importlib.resources import read_text
-from typing import Dict, List, NamedTuple, Union, Optional
-
-from rich.markdown import Markdown
-from rich.table import Table
+from dataclasses import dataclass, fields, replace
+from functools import lru_cache
+from importlib.resources import files
+from pathlib import Path
+from typing import Any, Dict, List, Tuple, Union, Optional
 
 from pollyxt_pipelines import config
 from pollyxt_pipelines.enums import Wavelength
-from pollyxt_pipelines.console import console
-from pollyxt_pipelines.utils import ints_to_csv, parse_into_string_or_integer_list
+from pollyxt_pipelines.utils import (
+    csv_to_ints,
+    ints_to_csv,
+    parse_into_string_or_integer_list,
+)
 
 
-class Location(NamedTuple):
+@dataclass(frozen=True)
+class Location:
     """
     Represents a physical location of PollyXT installation.
     """
@@ -151,16 +153,67 @@ class Location(NamedTuple):
     where X an integer)
     """
 
+    def __post_init__(self):
+        # Not a dataclass field, so it's left out of `_asdict()`, `print()` and comparisons
+        object.__setattr__(
+            self,
+            "_depol_channels",
+            {
+                Wavelength.NM_355: bool(
+                    self.calibration_configuration_355nm is not None
+                    and self.total_channel_355_nm_idx is not None
+                    and self.cross_channel_355_nm_idx is not None
+                    and self.calibration_355nm_total_channel_ids
+                    and self.calibration_355nm_cross_channel_ids
+                ),
+                Wavelength.NM_532: bool(
+                    self.calibration_configuration_532nm is not None
+                    and self.total_channel_532_nm_idx is not None
+                    and self.cross_channel_532_nm_idx is not None
+                    and self.calibration_532nm_total_channel_ids
+                    and self.calibration_532nm_cross_channel_ids
+                ),
+                Wavelength.NM_1064: bool(
+                    self.calibration_configuration_1064nm is not None
+                    and self.total_channel_1064_nm_idx is not None
+                    and self.cross_channel_1064_nm_idx is not None
+                    and self.calibration_1064nm_total_channel_ids
+                    and self.calibration_1064nm_cross_channel_ids
+                ),
+            },
+        )
+
+    def _asdict(self) -> Dict[str, Any]:
+        """
+        Returns the fields of this location as a dictionary. Kept from the `NamedTuple`
+        implementation, the values are not copied.
+        """
+
+        return {name: getattr(self, name) for name in _LOCATION_FIELD_NAMES}
+
+    def _replace(self, **changes) -> "Location":
+        """
+        Returns a copy of this location with some fields changed. Kept from the `NamedTuple`
+        implementation, same as `dataclasses.replace()`.
+        """
+
+        return replace(self, **changes)
+
     def print(self):
         """
         Prints this location as a Table in the terminal
         """
 
+        from rich.table import Table
+
+        from pollyxt_pipelines.console import console
+
         table = Table(title=self.name)
         table.add_column("Key")
         table.add_column("Value")
 
-        for key, value in self._asdict().items():
+        for key in _LOCATION_FIELD_NAMES:
+            value = getattr(self, key)
             if isinstance(value, list):
                 value = ints_to_csv(value)
             table.add_row(key, str(value))
@@ -171,25 +224,50 @@ class Location(NamedTuple):
         """
         Returns a dictionary of wavelengths to booleans, true if that corresponding
         wavelength has depolarization channels.
+
+        The dictionary is computed when the location is created, do not modify it.
         """
 
-        return {
-            Wavelength.NM_355: self.calibration_configuration_355nm is not None
-            and self.total_channel_355_nm_idx is not None
-            and self.cross_channel_355_nm_idx is not None
-            and self.calibration_355nm_total_channel_ids
-            and self.calibration_355nm_cross_channel_ids,
-            Wavelength.NM_532: self.calibration_configuration_532nm is not None
-            and self.total_channel_532_nm_idx is not None
-            and self.cross_channel_532_nm_idx is not None
-            and self.calibration_532nm_total_channel_ids
-            and self.calibration_532nm_cross_channel_ids,
-            Wavelength.NM_1064: self.calibration_configuration_1064nm is not None
-            and self.total_channel_1064_nm_idx is not None
-            and self.cross_channel_1064_nm_idx is not None
-            and self.calibration_1064nm_total_channel_ids
-            and self.calibration_1064nm_cross_channel_ids,
-        }
+        return self._depol_channels
+
+    def get_scc_variables(self) -> Dict[str, Any]:
+        """
+        Returns the values of the SCC variables that are taken from this location as numpy
+        arrays of the variable types: `channel_ID` (or `channel_string_ID` if the channel IDs
+        are strings), `Background_Low`, `Background_High` and `LR_Input`.
+
+        The arrays are created on first use and shared between calls, do not modify them.
+        """
+
+        variables = self.__dict__.get("_scc_variables")
+        if variables is None:
+            import numpy as np
+
+            if isinstance(self.channel_id[0], int):
+                channel_id = {"channel_ID": np.array(self.channel_id, dtype=np.int32)}
+            else:
+                str_len = max(len(x) for x in self.channel_id)
+                channel_id = {
+                    "channel_string_ID": np.array(self.channel_id, f"S{str_len}")
+                }
+
+            variables = {
+                **channel_id,
+                "Background_Low": np.array(self.background_low, dtype=np.float64),
+                "Background_High": np.array(self.background_high, dtype=np.float64),
+                "LR_Input": np.array(self.lr_input, dtype=np.int32),
+            }
+            for array in variables.values():
+                array.flags.writeable = False
+
+            # Not a dataclass field, same as `_depol_channels`
+            object.__setattr__(self, "_scc_variables", variables)
+
+        return variables
+
+
+_LOCATION_FIELD_NAMES = tuple(field.name for field in fields(Location))
+"""Names of the `Location` fields, in definition order"""
 
 
 def location_from_section(name: str, section: SectionProxy) -> Location:
@@ -198,11 +276,9 @@ def location_from_section(name: str, section: SectionProxy) -> Location:
     """
 
     channel_id = parse_into_string_or_integer_list(section.get("channel_id"))
-    background_low = [int(x.strip()) for x in section.get("background_low").split(",")]
-    background_high = [
-        int(x.strip()) for x in section.get("background_high").split(",")
-    ]
-    lr_input = [int(x.strip()) for x in section.get("lr_input").split(",")]
+    background_low = csv_to_ints(section.get("background_low"))
+    background_high = csv_to_ints(section.get("background_high"))
+    lr_input = csv_to_ints(section.get("lr_input"))
 
     calibration_355nm_total_channel_ids = parse_into_string_or_integer_list(
         section.get("calibration_355nm_total_channel_ids")
@@ -270,26 +346,38 @@ def location_from_section(name: str, section: SectionProxy) -> Location:
     )
 
 
+@lru_cache(maxsize=None)
+def custom_location_paths() -> Tuple[Path, ...]:
+    """
+    Returns the paths of the files where custom locations are read from. The last one
+    is the user's file.
+    """
+
+    return tuple(path / "locations.ini" for path in config.config_paths())
+
+
 def read_locations() -> Dict[str, Location]:
     """
     Reads all built-in and custom locations into a dictionary: name -> Location
     """
 
+    location_paths = custom_location_paths()
     locations = {}
 
     # Read built-in locations
-    locations_buffer = io.StringIO(
-        read_text("pollyxt_pipelines.locations", "locations.ini")
-    )
+    # These are parsed separately from the custom ones, so a custom location replaces a
+    # built-in location with the same name instead of being merged into it.
     locations_config = ConfigParser()
-    locations_config.read_file(locations_buffer)
+    locations_config.read_string(
+        files("pollyxt_pipelines.locations").joinpath("locations.ini").read_text(),
+        source="locations.ini",
+    )
 
     for name in locations_config.sections():
         section = locations_config[name]
         locations[name] = location_from_section(name, section)
 
     # Read custom locations
-    location_paths = [path / "locations.ini" for path in config.config_paths()]
     locations_config = ConfigParser()
     locations_config.read(location_paths)
 
@@ -298,6 +386,8 @@ def read_locations() -> Dict[str, Location]:
         try:
             locations[name] = location_from_section(name, section)
         except Exception:
+            from pollyxt_pipelines.console import console
+
             console.print(
                 f"Could not load locations from config file, problem occured in section [{name}]."
             )
@@ -310,8 +400,33 @@ def read_locations() -> Dict[str, Location]:
     return locations
 
 
-LOCATIONS = read_locations()
-"""List of all known locations"""
+@lru_cache(maxsize=1)
+def get_locations() -> Dict[str, Location]:
+    """
+    Returns all known locations as a dictionary: name -> Location
+
+    The locations are read on the first call and reused afterwards.
+    """
+
+    return read_locations()
+
+
+@lru_cache(maxsize=1)
+def _get_locations_by_scc_code() -> Dict[str, Location]:
+    """
+    Returns all known locations as a dictionary: SCC code -> Location
+    """
+
+    # Iterate in reverse so the first location with a given code wins, as in a linear scan.
+    # The codes are interned since they are looked up for every parsed SCC measurement.
+    return {sys.intern(loc.scc_code): loc for loc in reversed(get_locations().values())}
+
+
+def __getattr__(name: str):
+    # `LOCATIONS` used to be read at import time, keep it available for existing code
+    if name == "LOCATIONS":
+        return get_locations()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 def get_location_by_scc_code(code: str) -> Union[Location, None]:
@@ -319,10 +434,7 @@ def get_location_by_scc_code(code: str) -> Union[Location, None]:
     Returns a location by its SCC code or `None` if it doesn't exist.
     """
 
-    for loc in LOCATIONS.values():
-        if loc.scc_code == code:
-            return loc
-    return None
+    return _get_locations_by_scc_code().get(code)
 
 
 def unknown_location_error(name: str):
@@ -330,10 +442,13 @@ def unknown_location_error(name: str):
     Prints an error message that the given location is not found, along with a
     list of known locations
     """
-    error = (
-        f"[error]Could not find location[/error]{name}[error]\nKnown locations:\n\n."
-    )
-    for l in LOCATIONS:
-        error += f"* {l.name}"
 
-    console.print(Markdown(error))
+    from rich.markdown import Markdown
+
+    from pollyxt_pipelines.console import console
+
+    console.print(f"[error]Could not find location[/error] {name}")
+
+    known_locations = ["Known locations:", ""]
+    known_locations.extend(f"* {location_name}" for location_name in get_locations())
+    console.print(Markdown("\n".join(known_locations)))
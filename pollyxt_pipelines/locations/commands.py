@@ -6,7 +6,7 @@ from cleo import Command
 from rich.markdown import Markdown
 
 from pollyxt_pipelines.console import console
-from pollyxt_pipelines import locations, config
+from pollyxt_pipelines import locations
 
 
 class ShowLocations(Command):
@@ -21,11 +21,11 @@ class ShowLocations(Command):
 
         if not self.option("details"):
             output = ""
-            for name in locations.LOCATIONS.keys():
+            for name in locations.get_locations().keys():
                 output += f"* {name}\n"
             console.print(Markdown(output))
         else:
-            for location in locations.LOCATIONS.values():
+            for location in locations.get_locations().values():
                 location.print()
 
 
@@ -38,10 +38,10 @@ class LocationPath(Command):
     """
 
     def handle(self):
-        config_paths = config.config_paths()
+        location_paths = locations.custom_location_paths()
 
         if self.option("user"):
-            console.print(config_paths[-1].parent / "locations.ini")
+            console.print(location_paths[-1])
         else:
-            for path in config_paths:
-                console.print(path.parent / "locations.ini")
+            for path in location_paths:
+                console.print(path)
@@ -0,0 +1,29 @@
+from pollyxt_pipelines import locations
+
+
+def test_get_location_by_scc_code():
+    """
+    Tests that the SCC code index agrees with the known locations
+    """
+
+    for location in locations.get_locations().values():
+        found = locations.get_location_by_scc_code(location.scc_code)
+        assert found is not None
+        assert found.scc_code == location.scc_code
+
+    assert locations.get_location_by_scc_code("aky").name == "Antikythera"
+    assert locations.get_location_by_scc_code("not-a-station") is None
+
+
+def test_get_scc_variables():
+    """
+    Tests that the SCC variable arrays match the location's values and are shared
+    """
+
+    location = locations.get_locations()["Antikythera"]
+    variables = location.get_scc_variables()
+
+    assert list(variables["Background_Low"]) == location.background_low
+    assert list(variables["Background_High"]) == location.background_high
+    assert list(variables["LR_Input"]) == location.lr_input
+    assert location.get_scc_variables() is variables
@@ -2,15 +2,23 @@
 Commands for creating SCC files
 """
 
+from dataclasses import replace
 from datetime import timedelta
 from pathlib import Path
+import os
 
 from cleo import Command
 
-from pollyxt_pipelines import locations, radiosondes
+from pollyxt_pipelines import locations, utils
 from pollyxt_pipelines.console import console
-from pollyxt_pipelines.polly_to_scc import pollyxt, scc_netcdf
-from pollyxt_pipelines.polly_to_scc.exceptions import BadMeasurementTime
+from pollyxt_pipelines.enums import Atmosphere
+from pollyxt_pipelines.polly_to_scc.exceptions import (
+    BadMeasurementTime,
+    CalibrationFileFailed,
+)
+
+OUTPUT_BATCH_SIZE = 16
+"""How many progress messages are written together when the output is not a terminal"""
 
 
 class CreateSCC(Command):
@@ -30,6 +38,7 @@ class CreateSCC(Command):
         {--no-calibration : Do not create calibration files}
         {--system-id-day= : Optionally *override* the day system ID with a custom value.}
         {--system-id-night= : Optionally *override* the night system ID with a custom value.}
+        {--jobs= : How many processes to use for reading input files and creating SCC files, or `auto` for one per CPU. Default is one.}
     """
 
     help = """
@@ -71,6 +80,9 @@ class CreateSCC(Command):
     """
 
     def handle(self):
+        from pollyxt_pipelines import radiosondes
+        from pollyxt_pipelines.polly_to_scc import pollyxt, scc_netcdf
+
         # Check output directory
         output_path = Path(self.argument("output-path"))
         output_path.mkdir(parents=True, exist_ok=True)
@@ -80,9 +92,9 @@ class CreateSCC(Command):
         interval = self.option("interval")
         atmosphere = self.option("atmosphere")
         if atmosphere is None:
-            atmosphere = scc_netcdf.Atmosphere.STANDARD_ATMOSPHERE
+            atmosphere = Atmosphere.STANDARD_ATMOSPHERE
         else:
-            atmosphere = scc_netcdf.Atmosphere.from_string(atmosphere)
+            atmosphere = Atmosphere.from_string(atmosphere)
         if interval is None:
             interval = 60  # Default duration is 1 hour/60 minutes
         interval = timedelta(minutes=int(interval))
@@ -93,6 +105,16 @@ class CreateSCC(Command):
                 "`--end-time` [error]can't be used without[/error] `--start-time`."
             )
             return 1
+        try:
+            if start_time is not None:
+                start_time = utils.parse_date_option(start_time)
+            if end_time is not None:
+                end_time = utils.parse_date_option(end_time)
+        except ValueError:
+            console.print(
+                "[error]Values for `--start-time` and `--end-time` must be in XX:MM, HH:MM or YYYY-mm-DD_HH:MM format![/error]"
+            )
+            return 1
         system_id_day = self.option("system-id-day")
         if system_id_day is not None:
             try:
@@ -111,25 +133,43 @@ class CreateSCC(Command):
                     "[error]Value for system-id-night is not convertable to int![/error]"
                 )
                 return 1
+        jobs = self.option("jobs")
+        if jobs is None:
+            jobs = 1
+        elif jobs == "auto":
+            jobs = os.cpu_count() or 1
+        else:
+            try:
+                jobs = int(jobs)
+            except ValueError:
+                jobs = 0
+            if jobs < 1:
+                console.print(
+                    "[error]Value for jobs must be a positive integer![/error]"
+                )
+                return 1
 
         # Try to get location
         location_name = self.argument("location")
-        location = locations.LOCATIONS[location_name]
+        location = locations.get_locations()[location_name]
         if location is None:
             locations.unknown_location_error(location_name)
             return 1
 
         # If system IDs are set, override them in the current location
         if system_id_day is not None:
-            location = location._replace(daytime_configuration=system_id_day)
+            location = replace(location, daytime_configuration=system_id_day)
         if system_id_night is not None:
-            location = location._replace(nighttime_configuration=system_id_night)
+            location = replace(location, nighttime_configuration=system_id_night)
 
         # Create a repository for the given path
         try:
             console.print("Building repository...")
             repository = pollyxt.PollyXTRepository(
-                Path(self.argument("input")), location
+                Path(self.argument("input")),
+                location,
+                recursive=self.option("recursive"),
+                workers=jobs,
             )
         except BadMeasurementTime as ex:
             console.print(
@@ -140,6 +180,7 @@ class CreateSCC(Command):
 
         # Iterate over list and convert files
         skip_calibration = self.option("no-calibration")
+        create_radiosondes = atmosphere == Atmosphere.RADIOSONDE
 
         converter = scc_netcdf.convert_pollyxt_file(
             repository,
@@ -151,26 +192,47 @@ class CreateSCC(Command):
             atmosphere=atmosphere,
             start_time=start_time,
             end_time=end_time,
+            workers=jobs,
         )
-        for id, path, timestamp_start, timestamp_end in converter:
-            start_str = timestamp_start.strftime("%Y-%m-%d %H:%M")
-            end_str = timestamp_end.strftime("%Y-%m-%d %H:%M")
-            if "calibration" in str(path):
-                console.print(
-                    f"[info]Created calibration file with measurement ID[/info] {id} [info]at[/info] {str(path)} [info]({start_str} - {end_str})[/info]"
-                )
-            else:
-                console.print(
-                    f"[info]Created file with measurement ID[/info] {id} [info]at[/info] {str(path)} [info]({start_str} - {end_str})[/info]"
-                )
-
-            if atmosphere == scc_netcdf.Atmosphere.RADIOSONDE:
-                radiosondes.create_radiosonde_netcdf(
-                    "wrf_noa",
-                    location,
-                    timestamp_start,
-                    timestamp_start + interval,
-                    netcdf_path=output_path / f"rs_{id[:-2]}.nc",
-                )
+        # When the output is not a terminal (e.g. the log of a scheduled job), nobody
+        # follows the progress, so the messages are written in batches
+        batch_size = 1 if console.is_terminal else OUTPUT_BATCH_SIZE
+        lines = []
+        # The repository keeps the last file it read open until the conversion is over
+        with repository:
+            try:
+                for result in converter:
+                    if isinstance(result, CalibrationFileFailed):
+                        lines.append(f"[error]{result}[/error]")
+                    else:
+                        id, path, timestamp_start, timestamp_end = result
+                        start_str = timestamp_start.isoformat(
+                            sep=" ", timespec="minutes"
+                        )
+                        end_str = timestamp_end.isoformat(sep=" ", timespec="minutes")
+                        if path.name.startswith("calibration_"):
+                            kind = "calibration file"
+                        else:
+                            kind = "file"
+                        lines.append(
+                            f"[info]Created {kind} with measurement ID[/info] {id} [info]at[/info] {str(path)} [info]({start_str} - {end_str})[/info]"
+                        )
+
+                        if create_radiosondes:
+                            radiosondes.create_radiosonde_netcdf(
+                                "wrf_noa",
+                                location,
+                                timestamp_start,
+                                timestamp_start + interval,
+                                netcdf_path=output_path / f"rs_{id[:-2]}.nc",
+                            )
+
+                    if len(lines) >= batch_size:
+                        console.print("\n".join(lines))
+                        lines.clear()
+            finally:
+                # Also written if the conversion fails, so the log lists every created file
+                if lines:
+                    console.print("\n".join(lines))
 
         console.print("\n[info]Done![/info]")
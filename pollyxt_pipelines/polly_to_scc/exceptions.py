@@ -34,7 +34,8 @@ class NoFilesFound(Exception):
     """
 
     def __init__(self, path: Path):
-        super(Exception, self)
+        super().__init__(path)
+
         self.path = path
 
     def __str__(self) -> str:
@@ -54,3 +55,21 @@ class BadMeasurementTime(Exception):
 
     def __str__(self) -> str:
         return f"Bad measurement time value was encountered in file {self.filename}: {str(self.value)}"
+
+
+class CalibrationFileFailed(Exception):
+    """
+    Describes a calibration file that could not be created. These are yielded by
+    `convert_pollyxt_file()` instead of being raised, so the conversion goes on.
+    """
+
+    def __init__(self, wavelength: int, reason: str) -> None:
+        super().__init__(wavelength, reason)
+
+        self.wavelength = wavelength
+        self.reason = reason
+
+    def __str__(self) -> str:
+        return (
+            f"Failed to generate calibration file ({self.wavelength}nm): {self.reason}"
+        )
@@ -2,8 +2,12 @@
 Routines related to PollyXT files
 """
 
+import os
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+from functools import lru_cache
 from pathlib import Path
-from typing import Iterable, Tuple, Union
+from typing import Iterable, Iterator, Tuple, Union
 from datetime import datetime, timedelta
 
 import numpy as np
@@ -29,10 +33,54 @@ def polly_date_to_datetime(timestamp: Tuple[int, int]) -> datetime:
         A datetime object
     """
     day, seconds = timestamp
-    day_str = str(day)
 
-    date = datetime.strptime(day_str, "%Y%m%d")
-    return date + timedelta(seconds=int(seconds))
+    return _polly_day_to_datetime(int(day)) + timedelta(seconds=int(seconds))
+
+
+@lru_cache(maxsize=4096)
+def _polly_day_to_datetime(day: int) -> datetime:
+    """
+    Converts a PollyXT date (YYYYMMDD as an integer) to a datetime. Cached, since all profiles of
+    a file usually share the same day.
+    """
+    return datetime(day // 10000, day // 100 % 100, day % 100)
+
+
+def polly_dates_to_datetime64(measurement_time: np.ndarray) -> np.ndarray:
+    """
+    Converts a whole PollyXT `measurement_time` array at once. This is the vectorized version of
+    `polly_date_to_datetime()`, it uses integer arithmetic instead of parsing each date.
+
+    Parameters:
+        measurement_time: Array of PollyXT timestamps, with two columns: 1) date as YYYYMMDD 2) seconds since start of day
+
+    Returns:
+        An array of `datetime64[s]`, which is NaT where the date is invalid
+    """
+    day = measurement_time[:, 0].astype(np.int64)
+    seconds = measurement_time[:, 1].astype(np.int64)
+
+    # Build the dates from the first day of each month, so that invalid days can be detected
+    years, months, days = day // 10000, day // 100 % 100, day % 100
+    month_start = (years - 1970).astype("datetime64[Y]").astype("datetime64[M]")
+    month_start += months - 1
+    dates = month_start.astype("datetime64[D]") + (days - 1)
+
+    invalid = (months < 1) | (months > 12) | (days < 1)
+    invalid |= dates >= (month_start + 1).astype("datetime64[D]")
+
+    timestamps = dates.astype("datetime64[s]") + seconds.astype("timedelta64[s]")
+    timestamps[invalid] = np.datetime64("NaT")
+    return timestamps
+
+
+def _first_and_last_rows(variable) -> np.ndarray:
+    """
+    Reads only the first and the last row of a 2D netCDF variable
+    """
+    if len(variable.shape) != 2:
+        return variable[:]
+    return np.stack([variable[0, :], variable[-1, :]])
 
 
 def get_measurement_period(
@@ -49,13 +97,14 @@ def get_measurement_period(
         A tuple containing the start and end dates.
     """
 
-    # Read `measurement_time` variable, a bit different for each source
+    # Read `measurement_time` variable, a bit different for each source. From files, only the
+    # first and last rows are needed.
     if isinstance(input, Path):
-        nc = Dataset(input, "r")
-        measurement_time = nc["measurement_time"][:]
-        nc.close()
+        with Dataset(input, "r") as nc:
+            nc.set_auto_mask(False)
+            measurement_time = _first_and_last_rows(nc["measurement_time"])
     elif isinstance(input, Dataset):
-        measurement_time = input["measurement_time"][:]
+        measurement_time = _first_and_last_rows(input["measurement_time"])
     elif isinstance(input, np.ndarray):
         measurement_time = input
     else:
@@ -68,11 +117,10 @@ def get_measurement_period(
     assert len(shape) == 2
     assert shape[1] == 2
 
-    # Parse start/end times
-    day_str = str(measurement_time[0, 0])
-    date = datetime.strptime(day_str, "%Y%m%d")
-    start = date + timedelta(seconds=int(measurement_time[0, 1]))
-    end = date + timedelta(seconds=int(measurement_time[-1, 1]))
+    # Parse start/end times, both are relative to the first day
+    day = _polly_day_to_datetime(int(measurement_time[0, 0]))
+    start = day + timedelta(seconds=int(measurement_time[0, 1]))
+    end = day + timedelta(seconds=int(measurement_time[-1, 1]))
 
     return start, end
 
@@ -96,13 +144,13 @@ def find_time_indices(
     if start < measurement_start:
         mstart = measurement_start.strftime("%H:%M")
         raise ValueError(f"Selected start ({start}) is before file start ({mstart})!")
-    if start > measurement_end:
+    if end > measurement_end:
         mend = measurement_end.strftime("%H:%M")
         raise ValueError(f"Selected end ({end}) is after file end ({mend})!")
 
     # Find indices
-    dt1 = (start - measurement_start).seconds
-    dt2 = (end - measurement_start).seconds
+    dt1 = int((start - measurement_start).total_seconds())
+    dt2 = int((end - measurement_start).total_seconds())
 
     index_start = dt1 // 30
     index_end = dt2 // 30
@@ -110,18 +158,108 @@ def find_time_indices(
     return (index_start, index_end)
 
 
+def iter_netcdf_files(root: Path, recursive: bool = False) -> Iterator[Path]:
+    """
+    Yields the netCDF files inside a directory as they are found, without listing the whole
+    directory tree first.
+
+    Parameters:
+        root: The directory to search
+        recursive: If set, subdirectories are also searched
+
+    Returns:
+        An iterator over the paths of the netCDF files
+    """
+
+    stack = [root]
+    while stack:
+        with os.scandir(stack.pop()) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    if recursive:
+                        stack.append(entry.path)
+                elif entry.name.endswith(".nc"):
+                    yield Path(entry.path)
+
+
+def read_index(path: Path) -> pd.DataFrame:
+    """
+    Reads the timestamp and the depolarization calibration angle of each profile in a PollyXT
+    file. This is a top-level function so it can be sent to worker processes.
+
+    Parameters:
+        path: The PollyXT netCDF file to read
+
+    Returns:
+        One row per profile, to be used in the `PollyXTRepository` index
+    """
+
+    with Dataset(path, "r") as nc:
+        nc.set_auto_mask(False)
+        measurement_time = nc["measurement_time"][:]
+        depol_cal_angle = nc["depol_cal_angle"][:]
+
+    timestamps = polly_dates_to_datetime64(measurement_time)
+    invalid = np.isnat(timestamps)
+    if invalid.any():
+        bad_row = np.flatnonzero(invalid)[0]
+        raise BadMeasurementTime(path, measurement_time[bad_row])
+
+    return pd.DataFrame(
+        {
+            "timestamp": timestamps,
+            "index": np.arange(len(timestamps)),
+            "path": path,
+            "depol_cal_angle": depol_cal_angle,
+        }
+    )
+
+
+# Size of the chunk cache used for `raw_signal`. The default cache of netCDF is smaller than a
+# compressed chunk of it, so each partial read would decompress the same chunks again.
+RAW_SIGNAL_CHUNK_CACHE_MB = 64
+
+
+def open_pollyxt_dataset(
+    path: Path, chunk_cache_mb: int = RAW_SIGNAL_CHUNK_CACHE_MB
+) -> Dataset:
+    """
+    Opens a PollyXT netCDF file for reading, with a chunk cache large enough for `raw_signal`.
+
+    Parameters:
+        path: The file to open
+        chunk_cache_mb: Size of the chunk cache for `raw_signal`, in MB
+
+    Returns:
+        The opened dataset
+    """
+
+    nc = Dataset(path, "r")
+
+    # Only HDF5-based files are chunked
+    if nc.data_model.startswith("NETCDF4") and "raw_signal" in nc.variables:
+        nc["raw_signal"].set_var_chunk_cache(size=chunk_cache_mb * 1024 * 1024)
+
+    return nc
+
+
 class PollyXTRepository:
     """
     Represents a collection of PollyXT netCDF files. Provides facilities for reading data from such
     files, even across single-file boundaries.
     """
 
-    def __init__(self, path: Path, location: Location):
+    def __init__(
+        self, path: Path, location: Location, recursive: bool = False, workers: int = 1
+    ):
         """
         Create a repository
 
         Parameters
             path: Where are the PollyXT netCDF files stored. Can either be a directory of a single file
+            location: Where the measurements took place
+            recursive: If set and `path` is a directory, files in subdirectories are also included
+            workers: How many processes to use for reading the files
         """
 
         # Create a list of files to include in the repository
@@ -131,47 +269,81 @@ class PollyXTRepository:
         self.location = location
 
         if self.path.is_dir():
-            self.files = list(self.path.glob("*.nc"))
+            paths = iter_netcdf_files(self.path, recursive)
         elif self.path.is_file():
-            self.files = [self.path]
+            paths = [self.path]
         else:
             raise ValueError(
                 f"Path {self.path} doesn't seem to be either a file or a directory"
             )
 
+        # Create the index table while the files are being discovered
+        if workers > 1:
+            self.files = list(paths)
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                file_indices = list(executor.map(read_index, self.files))
+        else:
+            self.files = []
+            file_indices = []
+            for path in paths:
+                self.files.append(path)
+                file_indices.append(read_index(path))
+
         if len(self.files) == 0:
             raise NoFilesFound(self.path)
 
-        # Create the index table
-        rows = []
-        for path in self.files:
-            with Dataset(path, "r") as nc:
-                measurement_time = nc["measurement_time"][:]
-                depol_cal_angle = nc["depol_cal_angle"][:]
-                for i, (timestamp, dcv) in enumerate(
-                    zip(measurement_time, depol_cal_angle)
-                ):
-                    # Parse date
-                    try:
-                        timestamp = polly_date_to_datetime(timestamp)
-                    except ValueError:
-                        raise BadMeasurementTime(path, timestamp)
-
-                    rows.append(
-                        {
-                            "timestamp": timestamp,
-                            "index": i,
-                            "path": path,
-                            "depol_cal_angle": dcv,
-                        }
-                    )
-
-        self.index = pd.DataFrame(rows)
-        self.index = self.index.sort_values("timestamp", ascending=True)
+        # Each path is repeated for all of its profiles, store it as a category instead.
+        # The sort is stable, so profiles with the same timestamp stay in file order.
+        self.index = pd.concat(file_indices, ignore_index=True)
+        self.index["path"] = self.index["path"].astype("category")
+        self.index = self.index.sort_values(
+            "timestamp", ascending=True, kind="mergesort"
+        )
         self.index["calibration"] = (
             self.index["depol_cal_angle"] != location.depol_calibration_zero_state
         )
 
+        # The last file that was read is kept open, see `_open()`
+        self._open_path = None
+        self._open_dataset = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __getstate__(self):
+        # Open files cannot be pickled for spawned worker processes. Forked workers inherit
+        # the state without pickling, so `close()` must be called before creating them.
+        state = self.__dict__.copy()
+        state["_open_path"] = None
+        state["_open_dataset"] = None
+        return state
+
+    def _open(self, path: Path) -> Dataset:
+        """
+        Opens a file of the repository. The last opened file is kept open, since consecutive
+        periods are usually read from the same file.
+        """
+
+        if path != self._open_path:
+            self.close()
+            self._open_dataset = open_pollyxt_dataset(path)
+            self._open_path = path
+
+        return self._open_dataset
+
+    def close(self):
+        """
+        Closes the file that is kept open by the repository, if any
+        """
+
+        if self._open_dataset is not None:
+            self._open_dataset.close()
+            self._open_path = None
+            self._open_dataset = None
+
     def get_time_period(self) -> Tuple[datetime, datetime]:
         """
         Returns the time period available in this repository
@@ -180,10 +352,33 @@ class PollyXTRepository:
             A tuple containing the first and last available timestamps
         """
 
-        start = self.index.iloc[0]["timestamp"]
-        end = self.index.iloc[-1]["timestamp"]
+        # The index is sorted by timestamp, so no file has to be opened for this
+        timestamps = self.index["timestamp"]
+
+        return timestamps.iat[0], timestamps.iat[-1]
+
+    def count_profiles(
+        self, starts: Iterable[datetime], ends: Iterable[datetime]
+    ) -> np.ndarray:
+        """
+        Counts the profiles in many periods at once. The whole batch is done with two binary
+        searches over the index, instead of filtering it for each period.
+
+        Parameters:
+            starts: The start of each period
+            ends: The end of each period, profiles at exactly this time are not counted
 
-        return start, end
+        Returns:
+            The number of profiles in each period
+        """
+
+        timestamps = self.index["timestamp"].to_numpy()
+        starts = np.array(starts, dtype=timestamps.dtype)
+        ends = np.array(ends, dtype=timestamps.dtype)
+
+        first = timestamps.searchsorted(starts, side="left")
+        last = timestamps.searchsorted(ends, side="left")
+        return last - first
 
     def get_calibration_periods(self) -> Iterable[Tuple[datetime, datetime]]:
         """
@@ -196,11 +391,14 @@ class PollyXTRepository:
             List[Tuple[datetime, datetime]]: A list containing periods (ie. tuples of start-time and end-time)
         """
 
-        groups = (self.index.calibration != self.index.calibration.shift()).cumsum()
+        # Find the runs of calibration profiles, they start at the even edges and end at the
+        # odd ones
+        calibration = self.index["calibration"].to_numpy(dtype=np.int8)
+        edges = np.flatnonzero(np.diff(calibration, prepend=0, append=0))
 
-        for i, g in self.index.groupby(groups):
-            if (g.depol_cal_angle != self.location.depol_calibration_zero_state).all():
-                yield g.iloc[0]["timestamp"], g.iloc[-1]["timestamp"]
+        timestamps = self.index["timestamp"]
+        for start, end in zip(edges[::2], edges[1::2]):
+            yield timestamps.iat[start], timestamps.iat[end - 1]
 
     def get_pollyxt_file(self, time_start: datetime, time_end: datetime):
         """
@@ -214,59 +412,77 @@ class PollyXTRepository:
             The PollyXTFile file for the requested period.
         """
 
-        # Filter index for given time range
-        mask = (self.index["timestamp"] >= time_start) & (
-            self.index["timestamp"] <= time_end
-        )
-        targets = self.index[mask]
+        # Filter index for given time range. It is sorted by timestamp, so a binary search
+        # finds the range.
+        timestamps = self.index["timestamp"].to_numpy()
+        first = timestamps.searchsorted(np.datetime64(time_start), side="left")
+        last = timestamps.searchsorted(np.datetime64(time_end), side="right")
+        targets = self.index.iloc[first:last]
         if targets.shape[0] == 0:
             raise NoMeasurementsInTimePeriod()
 
-        # Read all files and concat into the requested
-        polly_files = []
-        for path in targets["path"].unique():
-            targets_filtered = targets[targets["path"] == path]
-
-            start_index = targets_filtered["index"].min()
-            end_index = targets_filtered["index"].max()
-
-            polly_files.append(
-                PollyXTFile(
-                    path, location=self.location, start=start_index, end=end_index
-                )
+        # Read all files and concat into the requested period. The per-profile variables are
+        # copied into buffers for the whole period as each file is read, so that only one file is
+        # held in memory besides the result.
+        by_path = targets.groupby("path", sort=False, observed=True)
+        index_ranges = by_path["index"].agg(["min", "max"])
+        t_len = int((index_ranges["max"] - index_ranges["min"] + 1).sum())
+
+        pollyxt_file = None
+        buffers = {}
+        zenith_angles = []
+        offset = 0
+        for path, start_index, end_index in index_ranges.itertuples():
+            polly_file = PollyXTFile(
+                self._open(path),
+                location=self.location,
+                start=start_index,
+                end=end_index,
             )
-
-        # Concatenate data into one file
-        pollyxt_file = polly_files[0]
-        pollyxt_file.raw_signal = np.concatenate([x.raw_signal for x in polly_files])
-        pollyxt_file.raw_signal_swap = np.concatenate(
-            [x.raw_signal_swap for x in polly_files]
-        )
-        t_len = pollyxt_file.raw_signal.shape[0]
-        pollyxt_file.measurement_time = np.arange(0, t_len * 30, 30)
-        pollyxt_file.measurement_shots = np.concatenate(
-            [x.measurement_shots for x in polly_files]
-        )
+            zenith_angles.append(polly_file.zenith_angle)
+
+            if pollyxt_file is None:
+                pollyxt_file = polly_file
+                if len(index_ranges) == 1:
+                    # Nothing to concatenate
+                    break
+
+                for name in PER_PROFILE_VARIABLES:
+                    sample = getattr(polly_file, name)
+                    shape = (t_len,) + sample.shape[1:]
+                    buffers[name] = np.empty(shape, dtype=sample.dtype)
+
+            k = polly_file.raw_signal.shape[0]
+            for name, buffer in buffers.items():
+                buffer[offset : offset + k] = getattr(polly_file, name)
+            offset += k
+
+        for name, buffer in buffers.items():
+            setattr(pollyxt_file, name, buffer)
+        pollyxt_file.raw_signal_swap = np.swapaxes(pollyxt_file.raw_signal, 1, 2)
+        # Seconds since the start of the period, in the type of the SCC time variables
+        pollyxt_file.measurement_time = np.arange(0, t_len * 30, 30, dtype=np.int32)
         try:
-            pollyxt_file.zenith_angle = np.concatenate(
-                [x.zenith_angle for x in polly_files]
-            )
+            pollyxt_file.zenith_angle = np.concatenate(zenith_angles)
         except ValueError:
             # Sometimes these arrays are empty, this is not a problem
             pass
-        pollyxt_file.depol_cal_angle = np.concatenate(
-            [x.depol_cal_angle for x in polly_files]
-        )
-
-        pollyxt_file.calibration_mask = np.concatenate(
-            [x.calibration_mask for x in polly_files]
-        )
 
-        pollyxt_file.end_date = polly_files[-1].end_date
+        pollyxt_file.end_date = polly_file.end_date
 
         return pollyxt_file
 
 
+# Variables of `PollyXTFile` that have one row per profile
+PER_PROFILE_VARIABLES = (
+    "raw_signal",
+    "measurement_shots",
+    "depol_cal_angle",
+    "calibration_mask",
+    "timestamps",
+)
+
+
 class PollyXTFile:
     """
     Reads the variables of interest from a PollyXT netCDF file.
@@ -278,9 +494,12 @@ class PollyXTFile:
     end_date: datetime
 
     raw_signal: np.ndarray
+    # View of `raw_signal` with the last two axes swapped, ie. (time, channels, points)
     raw_signal_swap: np.ndarray
 
     measurement_time: np.ndarray
+    # `measurement_time` parsed as `datetime64[s]`, one per profile
+    timestamps: np.ndarray
     measurement_shots: np.ndarray
     zenith_angle: np.ndarray
     location_coordinates: np.ndarray
@@ -291,42 +510,54 @@ class PollyXTFile:
     calibration_mask: np.ndarray
 
     def __init__(
-        self, input_path: Path, location: Location, start: int = None, end: int = None
+        self,
+        input_path: Union[Path, Dataset],
+        location: Location,
+        start: int = None,
+        end: int = None,
+        chunk_cache_mb: int = RAW_SIGNAL_CHUNK_CACHE_MB,
     ):
         """
         Read a PollyXT netcdf file
 
         Parameters
-            input_path: Which file to read
+            input_path: Which file to read. If an opened dataset is given, it is not closed.
             start: Optionally, trim the file from this index
             end: Optionally, trim file until this index
+            chunk_cache_mb: Size of the chunk cache for `raw_signal`, if the file is opened here
         """
 
-        # Read the file
-        nc = Dataset(input_path, "r")
-
-        # Read measurement time and trim accoarding to the user provided indices
-        self.measurement_time = nc["measurement_time"][:]
-        if start is None:
-            start = 0
-        if end is None:
-            end = self.measurement_time.shape[0]
-
-        self.measurement_time = self.measurement_time[start : end + 1]
-
-        # Read the rest of the variables
-        # raw_signal is converted to float64 because it is required by SCC
-        self.raw_signal = nc["raw_signal"][start : end + 1, :, :]
-        self.raw_signal = np.array(self.raw_signal, dtype=np.float64)
+        # Read all variables in one pass over the file. The fill values are never used, so
+        # skip creating masked arrays.
+        if isinstance(input_path, Dataset):
+            dataset = nullcontext(input_path)
+        else:
+            dataset = open_pollyxt_dataset(input_path, chunk_cache_mb)
+        with dataset as nc:
+            nc.set_auto_mask(False)
+
+            # Only read the profiles within the user provided indices
+            measurement_time = nc["measurement_time"]
+            if start is None:
+                start = 0
+            if end is None:
+                end = measurement_time.shape[0]
+            profiles = slice(start, end + 1)
+
+            self.measurement_time = measurement_time[profiles]
+            self.measurement_shots = nc["measurement_shots"][profiles, :]
+            self.depol_cal_angle = nc["depol_cal_angle"][profiles]
+            self.zenith_angle = nc["zenithangle"][:]
+            self.location_coordinates = nc["location_coordinates"][:]
+
+            # raw_signal is kept in the (usually integer) type of the file, which is a fraction of
+            # the size of float64. SCC requires float64, but the conversion happens when the
+            # profiles are written to the `Raw_Lidar_Data` variable.
+            self.raw_signal = nc["raw_signal"][profiles, :, :]
+
+        # This is a view, the data are not copied
         self.raw_signal_swap = np.swapaxes(self.raw_signal, 1, 2)
 
-        self.measurement_shots = nc["measurement_shots"][start : end + 1, :]
-        self.zenith_angle = nc["zenithangle"][:]
-        self.location_coordinates = nc["location_coordinates"][:]
-        self.depol_cal_angle = nc["depol_cal_angle"][start : end + 1]
-
-        nc.close()
-
         self.calibration_mask = (
             self.depol_cal_angle != location.depol_calibration_zero_state
         )
@@ -334,5 +565,6 @@ class PollyXTFile:
         # Store some variables for easy access
         self.start_index = start
         self.end_index = end
-        self.start_date = polly_date_to_datetime(self.measurement_time[0, :])
-        self.end_date = polly_date_to_datetime(self.measurement_time[-1, :])
+        self.timestamps = polly_dates_to_datetime64(self.measurement_time)
+        self.start_date = self.timestamps[0].item()
+        self.end_date = self.timestamps[-1].item()
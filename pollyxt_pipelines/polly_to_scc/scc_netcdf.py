@@ -2,25 +2,83 @@
 Routines for converting PollyXT files to SCC files
 """
 
-from datetime import timedelta
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from functools import partial
 from pathlib import Path
-from typing import Tuple
+from typing import List, Optional, Tuple, Union
 import re
 
 import numpy as np
 from netCDF4 import Dataset
-from astral import LocationInfo
-from astral.sun import sunrise, sunset
 
 from pollyxt_pipelines import sun, utils
 from pollyxt_pipelines.locations import Location
 from pollyxt_pipelines.enums import Atmosphere, Wavelength
 from pollyxt_pipelines.polly_to_scc import pollyxt
 from pollyxt_pipelines.polly_to_scc.exceptions import (
+    CalibrationFileFailed,
     NoMeasurementsInTimePeriod,
     TimeOutsideFile,
 )
 
+# Upper size of a `Raw_Lidar_Data` chunk. Readers that go through the file one profile at a time
+# decompress a whole chunk for each profile, unless it fits in their chunk cache.
+RAW_LIDAR_DATA_CHUNK_BYTES = 1 << 20
+
+
+def _raw_lidar_data_chunks(
+    n_profiles: int, n_channels: int, n_points: int
+) -> Tuple[int, int, int]:
+    """
+    Returns the chunk shape of a `Raw_Lidar_Data` variable: whole profiles, as many as fit in
+    `RAW_LIDAR_DATA_CHUNK_BYTES` (at least one).
+    """
+
+    profile_bytes = n_channels * n_points * np.dtype(np.float64).itemsize
+    profiles_per_chunk = max(1, RAW_LIDAR_DATA_CHUNK_BYTES // profile_bytes)
+    return (max(1, min(n_profiles, profiles_per_chunk)), n_channels, n_points)
+
+
+def _select_profiles(signal: np.ndarray, selected: np.ndarray, dtype) -> np.ndarray:
+    """
+    Copies the selected profiles (first axis) of `signal` into a new C-contiguous array of the
+    given type. Consecutive profiles are copied as slices, so the type conversion and any
+    reordering of the axes happen in a single copy.
+    """
+
+    out = np.empty((np.count_nonzero(selected),) + signal.shape[1:], dtype=dtype)
+
+    # Find the runs of selected profiles, they start at the even edges and end at the odd ones
+    edges = np.flatnonzero(np.diff(selected.astype(np.int8), prepend=0, append=0))
+    offset = 0
+    for start, end in zip(edges[::2], edges[1::2]):
+        out[offset : offset + end - start] = signal[start:end]
+        offset += end - start
+
+    return out
+
+
+@contextmanager
+def _create_output(path: Path):
+    """
+    Creates a new netCDF file at `path` and closes it once the block exits. If writing fails,
+    the half-written file is removed so it can't be mistaken for a finished one.
+
+    Variables are not pre-filled with their fill value, so every variable must be written in
+    full before the block exits.
+    """
+    nc = Dataset(path, "w", format="NETCDF4")
+    nc.set_fill_off()
+    try:
+        yield nc
+    except BaseException:
+        nc.close()
+        path.unlink(missing_ok=True)
+        raise
+    nc.close()
+
 
 def create_scc_netcdf(
     pf: pollyxt.PollyXTFile,
@@ -38,9 +96,9 @@ def create_scc_netcdf(
         atmosphere: What kind of atmosphere to use.
 
     Note:
-        If atmosphere is set to Atmosphere.SOUNDING, the `Sounding_File_Name` attribute will be set to
-        `rs_{MEASUREMENT_ID}.rs`, ie the filename of the accompaning radiosonde. This file is *not* created
-        by this function.
+        If atmosphere is set to Atmosphere.RADIOSONDE, the `Sounding_File_Name` attribute will be set to
+        `rs_{MEASUREMENT_ID[:-2]}.nc`, ie the filename of the accompaning radiosonde. This file is *not*
+        created by this function. `Molecular_Calc` is always the value of `atmosphere`.
 
     Returns:
         A tuple containing  the measurement ID and the output path
@@ -52,146 +110,170 @@ def create_scc_netcdf(
     # Create SCC file
     # Output filename is always the measurement ID
     output_filename = output_path / f"{measurement_id}.nc"
-    nc = Dataset(output_filename, "w")
-
-    # Create dimensions (mandatory!)
-    nc.createDimension("points", np.size(pf.raw_signal, axis=1))
-    nc.createDimension("channels", np.size(pf.raw_signal, axis=2))
-    nc.createDimension("time", None)
-    nc.createDimension("nb_of_time_scales", 1)
-    nc.createDimension("scan_angles", 1)
-
-    # Create Global Attributes (mandatory!)
-    nc.Measurement_ID = measurement_id
-    nc.RawData_Start_Date = pf.start_date.strftime("%Y%m%d")
-    nc.RawData_Start_Time_UT = pf.start_date.strftime("%H%M%S")
-    nc.RawData_Stop_Time_UT = pf.end_date.strftime("%H%M%S")
-
-    # Create Global Attributes (optional)
-    nc.RawBck_Start_Date = nc.RawData_Start_Date
-    nc.RawBck_Start_Time_UT = nc.RawData_Start_Time_UT
-    nc.RawBck_Stop_Time_UT = nc.RawData_Stop_Time_UT
-    if atmosphere == Atmosphere.RADIOSONDE:
-        nc.Sounding_File_Name = f"rs_{measurement_id[:-2]}.nc"
-    # nc.Overlap_File_Name = 'ov_' + selected_start.strftime('%Y%m%daky%H') + '.nc'
-
-    # Calculate sunset and sunrise times for the current station
-    suninfo = sun.get_sun_times(location, pf.start_date)
-
-    if re.match(r"[0-2]\d:[0-5]\d", location.sunrise_time):
-        hh, mm = location.sunrise_time.split(":")
-        hh, mm = int(hh), int(mm)
-        sunrise_time = pf.start_date.replace(hour=hh, minute=mm)
-    elif suninfo.sunrise_time is not None:
-        sunrise_time = suninfo.sunrise_time.replace(tzinfo=None)
-        if re.match(r"[+-]\d+", location.sunrise_time):
-            sunrise_time += timedelta(minutes=int(location.sunrise_time))
-    else:
-        sunrise_time = None
-
-    if re.match(r"[0-2]\d:[0-5]\d", location.sunset_time):
-        hh, mm = location.sunset_time.split(":")
-        hh, mm = int(hh), int(mm)
-        sunset_time = pf.start_date.replace(hour=hh, minute=mm)
-    elif suninfo.sunset_time is not None:
-        sunset_time = suninfo.sunset_time.replace(tzinfo=None)
-        if re.match(r"[+-]\d+", location.sunset_time):
-            sunset_time += timedelta(minutes=int(location.sunset_time))
-    else:
-        sunset_time = None
-
-    if suninfo.always_up or (
-        sunrise_time < pf.start_date and pf.start_date < sunset_time
-    ):
-        nc.X_PollyXTPipelines_Configuration_ID = location.daytime_configuration
-        nc.X_PollyXTPipelines_Is_Daytime = "yes"
-    else:
-        nc.X_PollyXTPipelines_Configuration_ID = location.nighttime_configuration
-        nc.X_PollyXTPipelines_Is_Daytime = "no"
+    with _create_output(output_filename) as nc:
+
+        # Create dimensions (mandatory!)
+        _, n_points, n_channels = pf.raw_signal.shape
+        nc.createDimension("points", n_points)
+        nc.createDimension("channels", n_channels)
+        nc.createDimension("time", None)
+        nc.createDimension("nb_of_time_scales", 1)
+        nc.createDimension("scan_angles", 1)
+
+        # Create Global Attributes (mandatory!)
+        nc.Measurement_ID = measurement_id
+        nc.RawData_Start_Date = pf.start_date.strftime("%Y%m%d")
+        nc.RawData_Start_Time_UT = pf.start_date.strftime("%H%M%S")
+        nc.RawData_Stop_Time_UT = pf.end_date.strftime("%H%M%S")
+
+        # Create Global Attributes (optional)
+        nc.RawBck_Start_Date = nc.RawData_Start_Date
+        nc.RawBck_Start_Time_UT = nc.RawData_Start_Time_UT
+        nc.RawBck_Stop_Time_UT = nc.RawData_Stop_Time_UT
+        if atmosphere == Atmosphere.RADIOSONDE:
+            nc.Sounding_File_Name = f"rs_{measurement_id[:-2]}.nc"
+        # nc.Overlap_File_Name = 'ov_' + selected_start.strftime('%Y%m%daky%H') + '.nc'
+
+        # Calculate sunset and sunrise times for the current station
+        suninfo = sun.get_sun_times(location, pf.start_date)
+
+        if re.match(r"[0-2]\d:[0-5]\d", location.sunrise_time):
+            hh, mm = location.sunrise_time.split(":")
+            hh, mm = int(hh), int(mm)
+            sunrise_time = pf.start_date.replace(hour=hh, minute=mm)
+        elif suninfo.sunrise_time is not None:
+            sunrise_time = suninfo.sunrise_time.replace(tzinfo=None)
+            if re.match(r"[+-]\d+", location.sunrise_time):
+                sunrise_time += timedelta(minutes=int(location.sunrise_time))
+        else:
+            sunrise_time = None
+
+        if re.match(r"[0-2]\d:[0-5]\d", location.sunset_time):
+            hh, mm = location.sunset_time.split(":")
+            hh, mm = int(hh), int(mm)
+            sunset_time = pf.start_date.replace(hour=hh, minute=mm)
+        elif suninfo.sunset_time is not None:
+            sunset_time = suninfo.sunset_time.replace(tzinfo=None)
+            if re.match(r"[+-]\d+", location.sunset_time):
+                sunset_time += timedelta(minutes=int(location.sunset_time))
+        else:
+            sunset_time = None
+
+        # Without a sunrise or sunset time (e.g. polar night), it is only daytime if the sun is
+        # always up
+        if suninfo.always_up or (
+            sunrise_time is not None
+            and sunset_time is not None
+            and sunrise_time < pf.start_date < sunset_time
+        ):
+            nc.X_PollyXTPipelines_Configuration_ID = location.daytime_configuration
+            nc.X_PollyXTPipelines_Is_Daytime = "yes"
+        else:
+            nc.X_PollyXTPipelines_Configuration_ID = location.nighttime_configuration
+            nc.X_PollyXTPipelines_Is_Daytime = "no"
+
+        nc.X_PollyXTPipelines_Sunrise_time = (
+            sunrise_time.strftime("%H:%M") if sunrise_time is not None else "NA"
+        )
+        nc.X_PollyXTPipelines_Sunset_time = (
+            sunset_time.strftime("%H:%M") if sunset_time is not None else "NA"
+        )
 
-    nc.X_PollyXTPipelines_Sunrise_time = (
-        sunrise_time.strftime("%H:%M") if sunrise_time is not None else "NA"
-    )
-    nc.X_PollyXTPipelines_Sunset_time = (
-        sunset_time.strftime("%H:%M") if sunset_time is not None else "NA"
-    )
+        # Calibration profiles are skipped. Only the selected profiles are copied, the sizes are
+        # known without indexing `raw_signal`.
+        measurements = ~pf.calibration_mask
+        measurement_count = np.count_nonzero(measurements)
 
-    # Create Variables. (mandatory)
-    raw_data_start_time = nc.createVariable(
-        "Raw_Data_Start_Time", "i4", dimensions=("time", "nb_of_time_scales"), zlib=True
-    )
-    raw_data_stop_time = nc.createVariable(
-        "Raw_Data_Stop_Time", "i4", dimensions=("time", "nb_of_time_scales"), zlib=True
-    )
-    raw_lidar_data = nc.createVariable(
-        "Raw_Lidar_Data", "f8", dimensions=("time", "channels", "points"), zlib=True
-    )
-    channel_id = nc.createVariable(
-        "channel_ID", "i4", dimensions=("channels"), zlib=True
-    )
-    channel_id[:] = -1
-    if isinstance(location.channel_id[0], int):
-        channel_id[:] = np.array(location.channel_id)
-    else:
-        str_len = np.max([len(x) for x in location.channel_id])
-        channel_id = nc.createVariable(
-            "channel_string_ID",
-            f"S{str_len}",
-            dimensions=("channels"),
+        # Create Variables. (mandatory)
+        raw_data_start_time = nc.createVariable(
+            "Raw_Data_Start_Time",
+            "i4",
+            dimensions=("time", "nb_of_time_scales"),
+        )
+        raw_data_stop_time = nc.createVariable(
+            "Raw_Data_Stop_Time",
+            "i4",
+            dimensions=("time", "nb_of_time_scales"),
+        )
+        # Chunks hold whole profiles and are kept small, for readers that go through the file one
+        # profile at a time. The variable is written at once, so no chunk is ever partially
+        # written and the default chunk cache is enough. The shuffle filter does most of the work
+        # on float data, so the fastest deflate level is enough. The type must stay f8, since SCC
+        # requires it. The counts are only converted from their integer type when written.
+        raw_lidar_data = nc.createVariable(
+            "Raw_Lidar_Data",
+            "f8",
+            dimensions=("time", "channels", "points"),
+            zlib=True,
+            complevel=1,
+            shuffle=True,
+            chunksizes=_raw_lidar_data_chunks(measurement_count, n_channels, n_points),
+        )
+        location_variables = location.get_scc_variables()
+        channel_id = nc.createVariable("channel_ID", "i4", dimensions=("channels"))
+        if "channel_string_ID" in location_variables:
+            channel_string_id = nc.createVariable(
+                "channel_string_ID",
+                f"S{location_variables['channel_string_ID'].itemsize}",
+                dimensions=("channels"),
+            )
+        id_timescale = nc.createVariable("id_timescale", "i4", dimensions=("channels"))
+        laser_pointing_angle = nc.createVariable(
+            "Laser_Pointing_Angle", "f8", dimensions=("scan_angles")
+        )
+        laser_pointing_angle_of_profiles = nc.createVariable(
+            "Laser_Pointing_Angle_of_Profiles",
+            "i4",
+            dimensions=("time", "nb_of_time_scales"),
+        )
+        laser_shots = nc.createVariable(
+            "Laser_Shots", "i4", dimensions=("time", "channels")
+        )
+        background_low = nc.createVariable(
+            "Background_Low", "f8", dimensions=("channels")
+        )
+        background_high = nc.createVariable(
+            "Background_High", "f8", dimensions=("channels")
+        )
+        molecular_calc = nc.createVariable("Molecular_Calc", "i4", dimensions=())
+        pressure_at_lidar_station = nc.createVariable(
+            "Pressure_at_Lidar_Station", "f8", dimensions=()
+        )
+        temperature_at_lidar_station = nc.createVariable(
+            "Temperature_at_Lidar_Station", "f8", dimensions=()
+        )
+        lr_input = nc.createVariable("LR_Input", "i4", dimensions=("channels"))
+
+        # Fill Variables with Data. (mandatory)
+        profile_start_time = pf.measurement_time[measurements].astype(
+            np.int32, copy=False
+        )[:, None]
+        raw_data_start_time[:] = profile_start_time
+        raw_data_stop_time[:] = profile_start_time + 30
+        if "channel_string_ID" in location_variables:
+            channel_id[:] = -1
+            channel_string_id[:] = location_variables["channel_string_ID"]
+        else:
+            channel_id[:] = location_variables["channel_ID"]
+        id_timescale[:] = 0
+        laser_pointing_angle[:] = int(pf.zenith_angle.item(0))
+        # The variable lies on the unlimited dimension, so a scalar would not set its length
+        laser_pointing_angle_of_profiles[:] = np.broadcast_to(
+            np.int32(0), (measurement_count, 1)
+        )
+        laser_shots[:] = pf.measurement_shots[measurements]
+        background_low[:] = location_variables["Background_Low"]
+        background_high[:] = location_variables["Background_High"]
+        molecular_calc[:] = int(atmosphere)
+        pressure_at_lidar_station[:] = location.pressure
+        temperature_at_lidar_station[:] = location.temperature
+        lr_input[:] = location_variables["LR_Input"]
+
+        # The signal is written last, after all the small variables, as in
+        # `create_scc_calibration_netcdf()`
+        raw_lidar_data[:] = _select_profiles(
+            pf.raw_signal_swap, measurements, np.float64
         )
-        channel_id[:] = np.array(location.channel_id, f"S{str_len}")
-
-    id_timescale = nc.createVariable(
-        "id_timescale", "i4", dimensions=("channels"), zlib=True
-    )
-    laser_pointing_angle = nc.createVariable(
-        "Laser_Pointing_Angle", "f8", dimensions=("scan_angles"), zlib=True
-    )
-    laser_pointing_angle_of_profiles = nc.createVariable(
-        "Laser_Pointing_Angle_of_Profiles",
-        "i4",
-        dimensions=("time", "nb_of_time_scales"),
-        zlib=True,
-    )
-    laser_shots = nc.createVariable(
-        "Laser_Shots", "i4", dimensions=("time", "channels"), zlib=True
-    )
-    background_low = nc.createVariable(
-        "Background_Low", "f8", dimensions=("channels"), zlib=True
-    )
-    background_high = nc.createVariable(
-        "Background_High", "f8", dimensions=("channels"), zlib=True
-    )
-    molecular_calc = nc.createVariable("Molecular_Calc", "i4", dimensions=(), zlib=True)
-    nc.createVariable("Pol_Calib_Range_Min", "f8", dimensions=("channels"), zlib=True)
-    nc.createVariable("Pol_Calib_Range_Max", "f8", dimensions=("channels"), zlib=True)
-    pressure_at_lidar_station = nc.createVariable(
-        "Pressure_at_Lidar_Station", "f8", dimensions=(), zlib=True
-    )
-    temperature_at_lidar_station = nc.createVariable(
-        "Temperature_at_Lidar_Station", "f8", dimensions=(), zlib=True
-    )
-    lr_input = nc.createVariable("LR_Input", "i4", dimensions=("channels"), zlib=True)
-
-    # Fill Variables with Data. (mandatory)
-    raw_data_start_time[:] = pf.measurement_time[~pf.calibration_mask]
-    raw_data_stop_time[:] = (pf.measurement_time[~pf.calibration_mask]) + 30
-    raw_lidar_data[:] = pf.raw_signal_swap[~pf.calibration_mask]
-    id_timescale[:] = np.zeros(np.size(pf.raw_signal[~pf.calibration_mask], axis=2))
-    laser_pointing_angle[:] = int(pf.zenith_angle.item(0))
-    laser_pointing_angle_of_profiles[:] = np.zeros(
-        np.size(pf.raw_signal[~pf.calibration_mask], axis=0)
-    )
-    laser_shots[:] = pf.measurement_shots[~pf.calibration_mask]
-    background_low[:] = np.array(location.background_low)
-    background_high[:] = np.array(location.background_high)
-    molecular_calc[:] = int(atmosphere)
-    pressure_at_lidar_station[:] = location.pressure
-    temperature_at_lidar_station[:] = location.temperature
-    lr_input[:] = np.array(location.lr_input)
-
-    # Close the netCDF file.
-    nc.close()
 
     return measurement_id, output_filename
 
@@ -227,181 +309,327 @@ def create_scc_calibration_netcdf(
     # Create SCC file
     # Output filename is always the measurement ID
     output_filename = output_path / f"calibration_{measurement_id}_{int(wavelength)}.nc"
-    nc = Dataset(output_filename, "w")
-
-    # Find start/end indices for the +45 and -45 degree calibration cycles in Polly file
-    idx = list(np.where(np.diff(pf.depol_cal_angle))[0])
-    start_positive = 2
-    idx = list(filter(lambda x: x >= start_positive + 4, idx))
-    end_positive = idx[0]
-    positive_length = end_positive - start_positive
-
-    start_negative = idx[0] + 3
-    idx = list(filter(lambda x: x >= start_negative + 4, idx))
-    end_negative = pf.depol_cal_angle.shape[0] - 3
-    negative_length = end_negative - start_negative
-
-    # Reduce the larger period to match
-    if positive_length > negative_length:
-        end_positive -= positive_length - negative_length
-        positive_length = negative_length
-    elif negative_length > positive_length:
-        end_negative -= negative_length - positive_length
-        negative_length = positive_length
-
-    # Define total and cross channels IDs from Polly
-    if wavelength == Wavelength.NM_355:
-        total_channel_idx = location.total_channel_355_nm_idx
-        cross_channel_idx = location.cross_channel_355_nm_idx
-        channel_ids = np.array(
-            location.calibration_355nm_total_channel_ids
-            + location.calibration_355nm_cross_channel_ids
+    with _create_output(output_filename) as nc:
+
+        # Find start/end indices for the +45 and -45 degree calibration cycles in Polly file
+        angle_changes = np.flatnonzero(np.diff(pf.depol_cal_angle))
+        start_positive = 2
+        end_positive = int(angle_changes[angle_changes >= start_positive + 4][0])
+        positive_length = end_positive - start_positive
+
+        start_negative = end_positive + 3
+        end_negative = pf.depol_cal_angle.shape[0] - 3
+        negative_length = end_negative - start_negative
+
+        # Reduce the larger period to match
+        if positive_length > negative_length:
+            end_positive -= positive_length - negative_length
+            positive_length = negative_length
+        elif negative_length > positive_length:
+            end_negative -= negative_length - positive_length
+            negative_length = positive_length
+
+        # Define total and cross channels IDs from Polly
+        if wavelength == Wavelength.NM_355:
+            total_channel_idx = location.total_channel_355_nm_idx
+            cross_channel_idx = location.cross_channel_355_nm_idx
+            channel_ids = (
+                location.calibration_355nm_total_channel_ids
+                + location.calibration_355nm_cross_channel_ids
+            )
+            nc.Measurement_ID = measurement_id + "35"
+            nc.X_PollyXTPipelines_Configuration_ID = (
+                location.calibration_configuration_355nm
+            )
+        elif wavelength == Wavelength.NM_532:
+            total_channel_idx = location.total_channel_532_nm_idx
+            cross_channel_idx = location.cross_channel_532_nm_idx
+            channel_ids = (
+                location.calibration_532nm_total_channel_ids
+                + location.calibration_532nm_cross_channel_ids
+            )
+            nc.Measurement_ID = measurement_id + "53"
+            nc.X_PollyXTPipelines_Configuration_ID = (
+                location.calibration_configuration_532nm
+            )
+        elif wavelength == Wavelength.NM_1064:
+            total_channel_idx = location.total_channel_1064_nm_idx
+            cross_channel_idx = location.cross_channel_1064_nm_idx
+            channel_ids = (
+                location.calibration_1064nm_total_channel_ids
+                + location.calibration_1064nm_cross_channel_ids
+            )
+            nc.Measurement_ID = measurement_id + "10"
+            nc.X_PollyXTPipelines_Configuration_ID = (
+                location.calibration_configuration_1064nm
+            )
+        else:
+            raise ValueError(f"Unknown wavelength {wavelength}")
+
+        # Create Dimensions. (mandatory)
+        _, n_points, _ = pf.raw_signal.shape
+        nc.createDimension("points", n_points)
+        nc.createDimension("channels", 4)
+        nc.createDimension("time", positive_length)
+        nc.createDimension("nb_of_time_scales", 1)
+        nc.createDimension("scan_angles", 1)
+
+        # Create Global Attributes. (mandatory)
+        # Move start date a couple of profiles forward to accomodate the fact that we skip
+        # some profiles at the beginning of the file.
+        start_date = pf.start_date + timedelta(seconds=(start_positive * 30))
+        nc.RawData_Start_Date = start_date.strftime("%Y%m%d")
+        nc.RawData_Start_Time_UT = start_date.strftime("%H%M%S")
+        nc.RawData_Stop_Time_UT = pf.end_date.strftime("%H%M%S")
+
+        # Create Global Attributes (optional)
+        nc.RawBck_Start_Date = nc.RawData_Start_Date
+        nc.RawBck_Start_Time_UT = nc.RawData_Start_Time_UT
+        nc.RawBck_Stop_Time_UT = nc.RawData_Stop_Time_UT
+
+        # Create Variables. (mandatory)
+        raw_data_start_time = nc.createVariable(
+            "Raw_Data_Start_Time",
+            "i4",
+            dimensions=("time", "nb_of_time_scales"),
         )
-        nc.Measurement_ID = measurement_id + "35"
-        nc.X_PollyXTPipelines_Configuration_ID = (
-            location.calibration_configuration_355nm
+        raw_data_stop_time = nc.createVariable(
+            "Raw_Data_Stop_Time",
+            "i4",
+            dimensions=("time", "nb_of_time_scales"),
         )
-    elif wavelength == Wavelength.NM_532:
-        total_channel_idx = location.total_channel_532_nm_idx
-        cross_channel_idx = location.cross_channel_532_nm_idx
-        channel_ids = np.array(
-            location.calibration_532nm_total_channel_ids
-            + location.calibration_532nm_cross_channel_ids
+        # Same layout as in `create_scc_netcdf()`
+        raw_lidar_data = nc.createVariable(
+            "Raw_Lidar_Data",
+            "f8",
+            dimensions=("time", "channels", "points"),
+            zlib=True,
+            complevel=1,
+            shuffle=True,
+            chunksizes=_raw_lidar_data_chunks(positive_length, 4, n_points),
         )
-        nc.Measurement_ID = measurement_id + "53"
-        nc.X_PollyXTPipelines_Configuration_ID = (
-            location.calibration_configuration_532nm
+        channel_id = nc.createVariable("channel_ID", "i4", dimensions=("channels"))
+        string_ids = not isinstance(location.channel_id[0], int)
+        if string_ids:
+            str_len = max(len(x) for x in channel_ids)
+            channel_string_id = nc.createVariable(
+                "channel_string_ID",
+                f"S{str_len}",
+                dimensions=("channels"),
+            )
+        id_timescale = nc.createVariable("id_timescale", "i4", dimensions=("channels"))
+        laser_pointing_angle = nc.createVariable(
+            "Laser_Pointing_Angle", "f8", dimensions=("scan_angles")
         )
-    elif wavelength == Wavelength.NM_1064:
-        total_channel_idx = location.total_channel_1064_nm_idx
-        cross_channel_idx = location.cross_channel_1064_nm_idx
-        channel_ids = np.array(
-            location.calibration_1064nm_total_channel_ids
-            + location.calibration_1064nm_cross_channel_ids
+        laser_pointing_angle_of_profiles = nc.createVariable(
+            "Laser_Pointing_Angle_of_Profiles",
+            "i4",
+            dimensions=("time", "nb_of_time_scales"),
         )
-        nc.Measurement_ID = measurement_id + "10"
-        nc.X_PollyXTPipelines_Configuration_ID = (
-            location.calibration_configuration_1064nm
+        laser_shots = nc.createVariable(
+            "Laser_Shots", "i4", dimensions=("time", "channels")
         )
-    else:
-        raise ValueError(f"Unknown wavelength {wavelength}")
-
-    # Create Dimensions. (mandatory)
-    nc.createDimension("points", np.size(pf.raw_signal, axis=1))
-    nc.createDimension("channels", 4)
-    nc.createDimension("time", positive_length)
-    nc.createDimension("nb_of_time_scales", 1)
-    nc.createDimension("scan_angles", 1)
-
-    # Create Global Attributes. (mandatory)
-    # Move start date a couple of profiles forward to accomodate the fact that we skip
-    # some profiles at the beginning of the file.
-    start_date = pf.start_date + timedelta(seconds=(start_positive * 30))
-    nc.RawData_Start_Date = start_date.strftime("%Y%m%d")
-    nc.RawData_Start_Time_UT = start_date.strftime("%H%M%S")
-    nc.RawData_Stop_Time_UT = pf.end_date.strftime("%H%M%S")
-
-    # Create Global Attributes (optional)
-    nc.RawBck_Start_Date = nc.RawData_Start_Date
-    nc.RawBck_Start_Time_UT = nc.RawData_Start_Time_UT
-    nc.RawBck_Stop_Time_UT = nc.RawData_Stop_Time_UT
-
-    # Create Variables. (mandatory)
-    raw_data_start_time = nc.createVariable(
-        "Raw_Data_Start_Time", "i4", dimensions=("time", "nb_of_time_scales"), zlib=True
-    )
-    raw_data_stop_time = nc.createVariable(
-        "Raw_Data_Stop_Time", "i4", dimensions=("time", "nb_of_time_scales"), zlib=True
-    )
-    raw_lidar_data = nc.createVariable(
-        "Raw_Lidar_Data", "f8", dimensions=("time", "channels", "points"), zlib=True
-    )
-    channel_id = nc.createVariable(
-        "channel_ID", "i4", dimensions=("channels"), zlib=True
-    )
-    channel_id[:] = 1
-    if isinstance(location.channel_id[0], int):
-        channel_id[:] = np.array(channel_ids)
-    else:
-        str_len = np.max([len(x) for x in channel_ids])
-        channel_id = nc.createVariable(
-            "channel_string_ID",
-            f"S{str_len}",
-            dimensions=("channels"),
+        background_low = nc.createVariable(
+            "Background_Low", "f8", dimensions=("channels")
         )
-        channel_id[:] = np.array(channel_ids)
-    id_timescale = nc.createVariable(
-        "id_timescale", "i4", dimensions=("channels"), zlib=True
-    )
-    laser_pointing_angle = nc.createVariable(
-        "Laser_Pointing_Angle", "f8", dimensions=("scan_angles"), zlib=True
-    )
-    laser_pointing_angle_of_profiles = nc.createVariable(
-        "Laser_Pointing_Angle_of_Profiles",
-        "i4",
-        dimensions=("time", "nb_of_time_scales"),
-        zlib=True,
-    )
-    laser_shots = nc.createVariable(
-        "Laser_Shots", "i4", dimensions=("time", "channels"), zlib=True
-    )
-    background_low = nc.createVariable(
-        "Background_Low", "f8", dimensions=("channels"), zlib=True
-    )
-    background_high = nc.createVariable(
-        "Background_High", "f8", dimensions=("channels"), zlib=True
-    )
-    molecular_calc = nc.createVariable("Molecular_Calc", "i4", dimensions=(), zlib=True)
-    pol_calib_range_min_var = nc.createVariable(
-        "Pol_Calib_Range_Min", "f8", dimensions=("channels"), zlib=True
-    )
-    pol_calib_range_max_var = nc.createVariable(
-        "Pol_Calib_Range_Max", "f8", dimensions=("channels"), zlib=True
-    )
-    pressure_at_lidar_station = nc.createVariable(
-        "Pressure_at_Lidar_Station", "f8", dimensions=(), zlib=True
+        background_high = nc.createVariable(
+            "Background_High", "f8", dimensions=("channels")
+        )
+        molecular_calc = nc.createVariable("Molecular_Calc", "i4", dimensions=())
+        pol_calib_range_min_var = nc.createVariable(
+            "Pol_Calib_Range_Min", "f8", dimensions=("channels")
+        )
+        pol_calib_range_max_var = nc.createVariable(
+            "Pol_Calib_Range_Max", "f8", dimensions=("channels")
+        )
+        pressure_at_lidar_station = nc.createVariable(
+            "Pressure_at_Lidar_Station", "f8", dimensions=()
+        )
+        temperature_at_lidar_station = nc.createVariable(
+            "Temperature_at_Lidar_Station", "f8", dimensions=()
+        )
+
+        # Fill Variables with Data. (mandatory)
+        # Profile times are computed once, with the shape and type of the variables
+        profile_start_time = np.arange(0, positive_length * 30, 30, dtype=np.int32)[
+            :, None
+        ]
+        raw_data_start_time[:] = profile_start_time
+        raw_data_stop_time[:] = profile_start_time + 30
+        if string_ids:
+            channel_id[:] = 1
+            channel_string_id[:] = np.array(channel_ids, f"S{str_len}")
+        else:
+            channel_id[:] = np.array(channel_ids, dtype=np.int32)
+        id_timescale[:] = 0
+        laser_pointing_angle[:] = 5
+        laser_pointing_angle_of_profiles[:] = 0
+        laser_shots[:] = 600
+        background_low[:] = 0
+        background_high[:] = 249
+        molecular_calc[:] = 0
+        pol_calib_range_min_var[:] = pol_calib_range_min
+        pol_calib_range_max_var[:] = pol_calib_range_max
+        pressure_at_lidar_station[:] = location.pressure
+        temperature_at_lidar_station[:] = location.temperature
+
+        # Assemble the channels in memory, so the compressed variable is written once. The slices
+        # are views, each one is copied and converted to float64 directly into the buffer.
+        positive = pf.raw_signal_swap[start_positive:end_positive]
+        negative = pf.raw_signal_swap[start_negative:end_negative]
+        calibration_data = np.empty((positive_length, 4, n_points), dtype=np.float64)
+        # Channel order: total +45°, total -45°, cross +45°, cross -45°
+        calibration_data[:, 0, :] = positive[:, total_channel_idx, :]
+        calibration_data[:, 1, :] = negative[:, total_channel_idx, :]
+        calibration_data[:, 2, :] = positive[:, cross_channel_idx, :]
+        calibration_data[:, 3, :] = negative[:, cross_channel_idx, :]
+        raw_lidar_data[:] = calibration_data
+
+    return measurement_id, output_filename
+
+
+def split_period(
+    start: datetime, end: datetime, interval: timedelta, should_round: bool = False
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Splits a time period into consecutive intervals. All interval boundaries are computed at
+    once, as `datetime64[us]` arrays.
+
+    Parameters:
+        start: Start of the period
+        end: End of the period. The last interval starts before this, but it can end after it.
+        interval: Length of each interval
+        should_round: If true, the intervals start at whole hours. The first one is rounded
+            down (e.g. from 01:02 to 01:00) and the rest are a whole number of hours apart.
+
+    Returns:
+        The start and the end of each interval
+    """
+
+    first = start
+    step = interval
+    if should_round:
+        first = start.replace(microsecond=0, second=0, minute=0)
+        step = (interval // timedelta(hours=1)) * timedelta(hours=1) or interval
+
+    # The first interval exists if the period is not empty, every other one if the previous
+    # interval ends before the end of the period
+    count = 0
+    if start < end:
+        remaining = end - interval - first
+        count = 1 + max(0, -(-remaining // step))
+
+    starts = np.datetime64(first, "us") + np.arange(count) * np.timedelta64(step)
+    return starts, starts + np.timedelta64(interval)
+
+
+def convert_interval(
+    repo: pollyxt.PollyXTRepository,
+    output_path: Path,
+    location: Location,
+    atmosphere: Atmosphere,
+    interval_start: datetime,
+    interval_end: datetime,
+    is_last: bool = False,
+) -> Optional[Tuple[str, Path, datetime, datetime]]:
+    """
+    Creates the SCC file for one interval of a repository. This is a top-level function so
+    it can be sent to worker processes.
+
+    Parameters:
+        is_last: Set for the interval that reaches the end of the converted period. Its file
+                 is created even if its only profile is at exactly `interval_end`, since no
+                 later interval covers that profile.
+
+    Returns:
+        The measurement ID, output path, start and end of the created file, or `None` if
+        there are no measurements in the interval.
+    """
+
+    try:
+        pf = repo.get_pollyxt_file(interval_start, interval_end + timedelta(seconds=1))
+    except NoMeasurementsInTimePeriod:
+        return None
+
+    # The profile at `interval_end` is also the first one of the next interval. If it is the
+    # only profile here, the next interval creates a file with the same measurement ID.
+    if pf.start_date >= interval_end and not is_last:
+        return None
+
+    id, path = create_scc_netcdf(pf, output_path, location, atmosphere)
+    return id, path, pf.start_date, pf.end_date
+
+
+def convert_calibration_period(
+    repo: pollyxt.PollyXTRepository,
+    output_path: Path,
+    location: Location,
+    period_start: datetime,
+    period_end: datetime,
+) -> List[Union[Tuple[str, Path, datetime, datetime], CalibrationFileFailed]]:
+    """
+    Creates the calibration files of one calibration period, one for each wavelength with
+    depolarization channels. This is a top-level function so it can be sent to worker
+    processes.
+
+    Returns:
+        The measurement ID, output path, start and end of each created file. Files that
+        could not be created are returned as `CalibrationFileFailed` errors, so they are
+        reported by the caller, in order with the rest.
+    """
+
+    pf = repo.get_pollyxt_file(period_start, period_end)
+
+    # Generate calibration files for all channels that exist!
+    results = []
+    for wv, channel_exists in location.has_depol_channels().items():
+        if channel_exists:
+            # HACK, do something more robust here
+            try:
+                id, path = create_scc_calibration_netcdf(
+                    pf, output_path, location, wavelength=wv
+                )
+                results.append((id, path, period_start, period_end))
+            except Exception as ex:
+                results.append(CalibrationFileFailed(int(wv), str(ex)))
+
+    return results
+
+
+_worker_convert_interval = None
+"""`convert_interval()` bound to the repository of the current worker process"""
+
+_worker_convert_calibration_period = None
+"""`convert_calibration_period()` bound to the repository of the current worker process"""
+
+
+def _init_worker(
+    repo: pollyxt.PollyXTRepository,
+    output_path: Path,
+    location: Location,
+    atmosphere: Atmosphere,
+):
+    """
+    Runs once in every worker process, so the repository is sent to each worker only once
+    instead of along with every interval.
+    """
+    global _worker_convert_interval, _worker_convert_calibration_period
+    _worker_convert_interval = partial(
+        convert_interval, repo, output_path, location, atmosphere
     )
-    temperature_at_lidar_station = nc.createVariable(
-        "Temperature_at_Lidar_Station", "f8", dimensions=(), zlib=True
+    _worker_convert_calibration_period = partial(
+        convert_calibration_period, repo, output_path, location
     )
 
-    # Fill Variables with Data. (mandatory)
-    raw_data_start_time[:] = np.arange(0, positive_length) * 30
-    raw_data_stop_time[:] = (np.arange(0, positive_length) * 30) + 30
-    id_timescale[:] = np.array([0, 0, 0, 0])
-    laser_pointing_angle[:] = 5
-    laser_pointing_angle_of_profiles[:, :] = 0.0
-    laser_shots[:] = 600
-    background_low[:] = np.array([0, 0, 0, 0])
-    background_high[:] = np.array([249, 249, 249, 249])
-    molecular_calc[:] = 0
-    pol_calib_range_min_var[:] = np.repeat(pol_calib_range_min, 4)
-    pol_calib_range_max_var[:] = np.repeat(pol_calib_range_max, 4)
-    pressure_at_lidar_station[:] = location.pressure
-    temperature_at_lidar_station[:] = location.temperature
-
-    raw_lidar_data[:] = 0
-    # Total channel, +45°
-    raw_lidar_data[:, 0, :] = pf.raw_signal_swap[
-        start_positive:end_positive, total_channel_idx, :
-    ]
-    # Cross channel, +45°
-    raw_lidar_data[:, 2, :] = pf.raw_signal_swap[
-        start_positive:end_positive, cross_channel_idx, :
-    ]
-    # Total channel, -45°
-    raw_lidar_data[:, 1, :] = pf.raw_signal_swap[
-        start_negative:end_negative, total_channel_idx, :
-    ]
-    # Cross channel, -45°
-    raw_lidar_data[:, 3, :] = pf.raw_signal_swap[
-        start_negative:end_negative, cross_channel_idx, :
-    ]
-
-    # Close the netCDF file.
-    nc.close()
 
-    return measurement_id, output_filename
+def _convert_interval_in_worker(
+    interval_start: datetime, interval_end: datetime, is_last: bool
+):
+    return _worker_convert_interval(interval_start, interval_end, is_last)
+
+
+def _convert_calibration_period_in_worker(period_start: datetime, period_end: datetime):
+    return _worker_convert_calibration_period(period_start, period_end)
 
 
 def convert_pollyxt_file(
@@ -414,6 +642,7 @@ def convert_pollyxt_file(
     calibration=True,
     start_time=None,
     end_time=None,
+    workers=1,
 ):
     """
     Converts a pollyXT repository into a collection of SCC files. The input files will be split/merged into intervals
@@ -424,6 +653,9 @@ def convert_pollyxt_file(
         for measurement_id, path, start_time, end_time in convert_pollyxt_file(...):
             # Do something with id/path, maybe print a message?
 
+    Calibration files that could not be created are yielded as `CalibrationFileFailed`
+    errors instead of tuples, so the conversion goes on and they can be reported in order.
+
 
     Parameters:
         repo: PollyXT file to convert
@@ -433,9 +665,12 @@ def convert_pollyxt_file(
         atmosphere: Which atmosphere to use on SCC
         should_round: If true, the interval starts will be rounded down. For example, from 01:02 to 01:00.
         calibration: Set to False to disable generation of calibration files.
-        start_hour: Optionally, set when the first file should start. The intervals will start from here. (HH:MM or YYYY-MM-DD_HH:MM format, string)
+        start_hour: Optionally, set when the first file should start. The intervals will start from here. (HH:MM or YYYY-MM-DD_HH:MM format,
+                    string or parsed by `utils.parse_date_option()`)
         end_hour: Optionally, also set the end time. Must be used with `start_hour`. If this is set, only one output file
-                  is generated, for your target interval (HH:MM or YYYY-MM-DD_HH:MM format, string).
+                  is generated, for your target interval (HH:MM or YYYY-MM-DD_HH:MM format, string or parsed by
+                  `utils.parse_date_option()`).
+        workers: How many processes to use for creating the SCC files. Files are still yielded in order.
     """
 
     # Open input netCDF
@@ -463,49 +698,67 @@ def convert_pollyxt_file(
         if interval is None:
             interval = timedelta(seconds=(end_time - start_time).total_seconds())
 
-    # Create output files
-    interval_start = measurement_start
-    while interval_start < measurement_end:
-        # If the option is set, round down hours
-        if should_round:
-            interval_start = interval_start.replace(microsecond=0, second=0, minute=0)
-
-        # Interval end
-        interval_end = interval_start + interval
-
-        # Open netCDF file and convert to SCC
-        try:
-            pf = repo.get_pollyxt_file(
-                interval_start, interval_end + timedelta(seconds=1)
-            )
-            id, path = create_scc_netcdf(pf, output_path, location, atmosphere)
-
-            yield id, path, pf.start_date, pf.end_date
-        except NoMeasurementsInTimePeriod as ex:
-            # Go to next loop
-            interval_start = interval_end
-            continue
-
-        # Set start of next interval to the end of this one
-        interval_start = interval_end
-
-    # Generate calibration files
-    if calibration:
-        depol_channels = location.has_depol_channels()
-
-        # Check for any valid calibration intervals
+    # Find the output intervals. Skip the ones without measurements before reading any file
+    # for them, a profile at exactly the end of an interval belongs to the next one. The
+    # interval that reaches the end of the period has no next one, so it keeps that profile.
+    interval_starts, interval_ends = split_period(
+        measurement_start, measurement_end, interval, should_round
+    )
+    is_last = interval_ends >= np.datetime64(measurement_end)
+    count_ends = np.where(
+        is_last, interval_ends + np.timedelta64(1, "s"), interval_ends
+    )
+    has_profiles = repo.count_profiles(interval_starts, count_ends) > 0
+    interval_starts = interval_starts[has_profiles].tolist()
+    interval_ends = interval_ends[has_profiles].tolist()
+    is_last = is_last[has_profiles].tolist()
+
+    # Find the calibration periods inside the requested period, if there are any
+    # depolarization channels to create calibration files for
+    calibration_starts = []
+    calibration_ends = []
+    if calibration and any(location.has_depol_channels().values()):
         for start, end in repo.get_calibration_periods():
             if start > measurement_start and end < measurement_end:
-                pf = repo.get_pollyxt_file(start, end)
-
-                # Generate calibration files for all channels that exist!
-                for wv, channel_exists in depol_channels.items():
-                    if channel_exists:
-                        # HACK, do something more robust here
-                        try:
-                            id, path = create_scc_calibration_netcdf(
-                                pf, output_path, location, wavelength=wv
-                            )
-                            yield id, path, start, end
-                        except Exception as ex:
-                            print(f"Failed to generate calibration file: {ex}")
+                calibration_starts.append(start)
+                calibration_ends.append(end)
+
+    # Create output files, then the calibration files. In parallel, both are queued at once
+    # but the results are still yielded in that order.
+    workers = min(workers, len(interval_starts) + len(calibration_starts))
+    if workers > 1:
+        # Forked workers would share the file the repository keeps open
+        repo.close()
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(repo, output_path, location, atmosphere),
+        ) as executor:
+            results = executor.map(
+                _convert_interval_in_worker, interval_starts, interval_ends, is_last
+            )
+            calibration_results = executor.map(
+                _convert_calibration_period_in_worker,
+                calibration_starts,
+                calibration_ends,
+            )
+            try:
+                for result in results:
+                    if result is not None:
+                        yield result
+                for calibration_files in calibration_results:
+                    yield from calibration_files
+            finally:
+                # If the caller stops iterating (or fails), don't wait for the remaining
+                # intervals to be converted when the pool shuts down
+                executor.shutdown(cancel_futures=True)
+    else:
+        convert = partial(convert_interval, repo, output_path, location, atmosphere)
+        for result in map(convert, interval_starts, interval_ends, is_last):
+            if result is not None:
+                yield result
+
+        for start, end in zip(calibration_starts, calibration_ends):
+            yield from convert_calibration_period(
+                repo, output_path, location, start, end
+            )
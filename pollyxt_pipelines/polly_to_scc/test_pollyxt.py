@@ -1,46 +1,82 @@
+from datetime import datetime, timedelta
+
 import numpy as np
+import pytest
+from netCDF4 import Dataset
 
 from pollyxt_pipelines.polly_to_scc import pollyxt
+from pollyxt_pipelines.polly_to_scc.exceptions import BadMeasurementTime
 
 
-def test_make_nan_during_calibration():
+def write_index_variables(path, measurement_time, depol_cal_angle):
     """
-    Tests that calibration times are actually set to NaN
+    Writes the variables used by the repository index to a netCDF file
     """
 
-    # Depol angle with two calibration periods
-    depol_cal_angle = np.array([0.0, 1.0, 0.0, 2.0, 5.0])
+    with Dataset(path, "w") as nc:
+        nc.createDimension("time", measurement_time.shape[0])
+        nc.createDimension("date_and_seconds", 2)
 
-    # Original raw_signal array
-    t1 = np.array(
-        [
-            [1, 2, 3, 4, 5, 6, 7, 8, 9, 0],
-            [0, 9, 8, 7, 6, 5, 4, 3, 2, 1],
-            [1, 2, 3, 4, 5, 6, 7, 8, 9, 0],
-        ],
-        dtype=np.float32,
-    )
-    t2 = np.array(
-        [
-            [0, 9, 8, 7, 6, 5, 4, 3, 2, 1],
-            [1, 2, 3, 4, 5, 6, 7, 8, 9, 0],
-            [0, 9, 8, 7, 6, 5, 4, 3, 2, 1],
-        ],
-        dtype=np.float32,
+        v = nc.createVariable("measurement_time", "i4", ("time", "date_and_seconds"))
+        v[:] = measurement_time
+        v = nc.createVariable("depol_cal_angle", "f4", ("time",))
+        v[:] = depol_cal_angle
+
+
+def test_polly_dates_to_datetime64():
+    """
+    Tests that the vectorized date conversion matches the scalar one and marks invalid dates
+    """
+
+    measurement_time = np.array(
+        [[20200228, 86399], [20200229, 0], [20201231, 86400], [20210229, 0]]
     )
 
-    raw_signal = np.stack([t1, t2, t2, t1, t2])
+    timestamps = pollyxt.polly_dates_to_datetime64(measurement_time)
 
-    # Correct result
-    correct_raw_signal = np.copy(raw_signal)
-    correct_raw_signal[1, :, :] = np.nan
-    correct_raw_signal[3, :, :] = np.nan
-    correct_raw_signal[4, :, :] = np.nan
+    for timestamp, expected in zip(timestamps[:3], measurement_time[:3]):
+        assert timestamp.item() == pollyxt.polly_date_to_datetime(expected)
+    assert np.isnat(timestamps[3])
 
-    pollyxt.make_nan_during_calibration(depol_cal_angle, raw_signal)
 
-    assert np.all(np.isnan(raw_signal) == np.isnan(correct_raw_signal))
-    assert np.all(
-        (raw_signal == correct_raw_signal)
-        | (np.isnan(raw_signal) == np.isnan(correct_raw_signal))
-    )
+def test_read_index(tmp_path):
+    """
+    Tests that the index timestamps match the scalar date conversion
+    """
+
+    path = tmp_path / "polly.nc"
+    measurement_time = np.array([[20201231, 86340], [20201231, 86370], [20210101, 0]])
+    write_index_variables(path, measurement_time, np.array([0.0, 45.0, 0.0]))
+
+    index = pollyxt.read_index(path)
+
+    assert list(index["timestamp"]) == [
+        pollyxt.polly_date_to_datetime(timestamp) for timestamp in measurement_time
+    ]
+    assert list(index["index"]) == [0, 1, 2]
+    assert list(index["depol_cal_angle"]) == [0.0, 45.0, 0.0]
+    assert (index["path"] == path).all()
+
+    # Invalid dates must still be reported
+    measurement_time[2, 0] = 20211301
+    write_index_variables(path, measurement_time, np.zeros(3))
+
+    with pytest.raises(BadMeasurementTime):
+        pollyxt.read_index(path)
+
+
+def test_find_time_indices():
+    """
+    Tests finding the profiles of a period, including one that spans midnight
+    """
+
+    measurement_time = np.array([[20200101, 86400 - 60 + 30 * i] for i in range(6)])
+
+    start = datetime(2020, 1, 1, 23, 59, 30)
+    end = datetime(2020, 1, 2, 0, 1)
+    assert pollyxt.find_time_indices(measurement_time, start, end) == (1, 4)
+
+    with pytest.raises(ValueError):
+        pollyxt.find_time_indices(measurement_time, start, end + timedelta(hours=1))
+    with pytest.raises(ValueError):
+        pollyxt.find_time_indices(measurement_time, end, start)
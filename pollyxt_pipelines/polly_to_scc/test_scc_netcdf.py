@@ -0,0 +1,43 @@
+from datetime import datetime, timedelta
+
+from pollyxt_pipelines.polly_to_scc import scc_netcdf
+
+
+def test_split_period():
+    """
+    Tests splitting a period into intervals, with and without rounding to whole hours
+    """
+
+    start = datetime(2020, 1, 1, 1, 2)
+    end = datetime(2020, 1, 1, 3, 30)
+    hour = timedelta(hours=1)
+
+    starts, ends = scc_netcdf.split_period(start, end, hour)
+    assert starts.tolist() == [start, start + hour, start + 2 * hour]
+    assert ends.tolist() == [start + hour, start + 2 * hour, start + 3 * hour]
+
+    starts, ends = scc_netcdf.split_period(start, end, hour, should_round=True)
+    assert starts.tolist() == [datetime(2020, 1, 1, h) for h in (1, 2, 3)]
+    assert ends.tolist() == [datetime(2020, 1, 1, h) for h in (2, 3, 4)]
+
+    # Shorter intervals are not rounded after the first one
+    starts, _ = scc_netcdf.split_period(start, end, hour / 2, should_round=True)
+    assert len(starts) == 5
+    assert starts[-1].tolist() == datetime(2020, 1, 1, 3)
+
+    starts, ends = scc_netcdf.split_period(end, start, hour)
+    assert len(starts) == 0 and len(ends) == 0
+
+
+def test_raw_lidar_data_chunks():
+    """
+    Tests that `Raw_Lidar_Data` chunks are whole profiles and stay under the size limit
+    """
+
+    # 8 bytes * 2 channels * 1024 points = 16KB per profile
+    assert scc_netcdf._raw_lidar_data_chunks(10, 2, 1024) == (10, 2, 1024)
+    assert scc_netcdf._raw_lidar_data_chunks(1000, 2, 1024) == (64, 2, 1024)
+
+    # Profiles larger than the limit are still chunked one by one
+    assert scc_netcdf._raw_lidar_data_chunks(10, 13, 16384) == (1, 13, 16384)
+    assert scc_netcdf._raw_lidar_data_chunks(0, 4, 1024) == (1, 4, 1024)
@@ -5,7 +5,6 @@ Commands for performing the QC check on ELDEC products
 from cleo import Command
 
 from pollyxt_pipelines import config, locations
-from pollyxt_pipelines.qc_eldec import qc_eldec_file
 
 
 class QCEldec(Command):
@@ -32,12 +31,14 @@ class QCEldec(Command):
     """
 
     def handle(self):
+        from pollyxt_pipelines.qc_eldec import qc_eldec_file
+
         # Get arguments
         input_file = self.argument("input")
         plot_path = self.argument("plot")
 
         location_name = self.argument("location")
-        location = locations.LOCATIONS[location_name]
+        location = locations.get_locations()[location_name]
         if location is None:
             locations.unknown_location_error(location_name)
             return 1
@@ -7,7 +7,6 @@ Original code unlicensed but used with permission
 
 import os
 from datetime import datetime, timedelta
-from pathlib import Path
 
 import matplotlib.dates as mdates
 import numpy as np
@@ -43,8 +43,10 @@ def write_radiosonde_netcdf(
     nc = Dataset(path, "w")
     nc.createDimension("points", profile.shape[0])
 
+    # Small and always written in full, so not compressed nor pre-filled (same as the
+    # SCC measurement files)
     for name in ["Altitude", "Temperature", "Pressure", "RelativeHumidity"]:
-        v = nc.createVariable(name, "f8", dimensions=("points"), zlib=True)
+        v = nc.createVariable(name, "f8", dimensions=("points"), fill_value=False)
         v[:] = profile[name]
 
     # Add global attributes
@@ -1,7 +1,5 @@
-from datetime import date, datetime
+from datetime import datetime
 from pollyxt_pipelines import locations
-from pollyxt_pipelines.locations import LOCATIONS
-from pathlib import Path
 
 from cleo import Command
 from rich.markdown import Markdown
@@ -11,7 +9,6 @@ from pollyxt_pipelines.radiosondes import (
     RadiosondeProviders,
     write_radiosonde_netcdf,
 )
-from pollyxt_pipelines.config import Config
 from pollyxt_pipelines.console import console
 
 
@@ -42,7 +39,7 @@ class GetRadiosonde(Command):
 
         # Get location
         location = self.argument("location")
-        location = LOCATIONS.get(location, None)
+        location = locations.get_locations().get(location, None)
         if location is None:
             locations.unknown_location_error(self.argument("location"))
             return 1
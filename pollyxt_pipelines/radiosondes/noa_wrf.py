@@ -25,11 +25,11 @@ rs = read_wrf_daily_profile('ANTIKYTHERA', date.fromisoformat('2020-01-01'))
 """
 
 from datetime import date, datetime, timedelta
-from typing import Tuple, Union
+from functools import lru_cache
+from typing import Dict, Tuple
 from pathlib import Path
 
 import pandas as pd
-from rich.markdown import Markdown
 
 from pollyxt_pipelines.locations import Location
 from pollyxt_pipelines.config import Config
@@ -65,6 +65,69 @@ def calculate_wrf_path(location: str, date: date) -> Path:
     return file_path
 
 
+@lru_cache(maxsize=32)
+def read_wrf_file(path: Path, mtime_ns: int) -> pd.DataFrame:
+    """
+    Reads and parses a whole WRF profile file. Since each file contains a full day of profiles,
+    the result is cached so all files of the same day share a single read. The modification time
+    is part of the cache key, so updated files are read again.
+
+    Do not modify the returned DataFrame, it is shared between calls!
+
+    Parameters:
+        path: Path to the WRF profile file
+        mtime_ns: Modification time of the file, in nanoseconds
+
+    Returns:
+        All profiles of the file in a DataFrame
+    """
+
+    columns = ["timestamp", "pressure", "temperature", "dew point", "rh", "altitude"]
+    dtype = {col: float for col in columns}
+    dtype["timestamp"] = str
+
+    rs = pd.read_csv(path, header=0, names=columns, dtype=dtype)
+
+    rs["timestamp"] = pd.to_datetime(
+        rs["timestamp"].str.strip(), format="%Y-%m-%d_%H:%M:%S"
+    )
+    return rs.rename(
+        columns={
+            "altitude": "Altitude",
+            "temperature": "Temperature",
+            "pressure": "Pressure",
+            "rh": "RelativeHumidity",
+        }
+    )
+
+
+PROFILE_COLUMNS = ["Altitude", "Temperature", "Pressure", "RelativeHumidity"]
+"""Columns of the returned profiles, in the order expected by SCC radiosonde files"""
+
+
+@lru_cache(maxsize=32)
+def read_wrf_profiles(path: Path, mtime_ns: int) -> Dict[datetime, pd.DataFrame]:
+    """
+    Splits a WRF profile file to one profile per timestamp, in the order of the file, so each
+    sounding can be looked up without scanning the whole file. Cached like `read_wrf_file()`.
+
+    Do not modify the returned DataFrames, they are shared between calls!
+
+    Parameters:
+        path: Path to the WRF profile file
+        mtime_ns: Modification time of the file, in nanoseconds
+
+    Returns:
+        A dictionary from each sounding's timestamp to its vertical profile
+    """
+
+    rs = read_wrf_file(path, mtime_ns)
+    return {
+        timestamp: profile.loc[:, PROFILE_COLUMNS]
+        for timestamp, profile in rs.groupby("timestamp", sort=False)
+    }
+
+
 def read_wrf_daily_profile(
     location: Location, time_start: datetime, time_end: datetime
 ) -> Tuple[datetime, pd.DataFrame]:
@@ -89,33 +152,16 @@ def read_wrf_daily_profile(
     if not path.is_file():
         raise RadiosondeNotFound(location, "noa_wrf", time_start, path)
 
-    # Read the file and do some simple parsing
-    columns = ["timestamp", "pressure", "temperature", "dew point", "rh", "altitude"]
-    dtype = {col: float for col in columns}
-    dtype["timestamp"] = str
-
-    rs = pd.read_csv(path, header=0, names=columns, dtype=dtype)
-
-    rs["timestamp"] = pd.to_datetime(
-        rs["timestamp"].str.strip(), format="%Y-%m-%d_%H:%M:%S"
-    )
-    rs = rs.rename(
-        columns={
-            "altitude": "Altitude",
-            "temperature": "Temperature",
-            "pressure": "Pressure",
-            "rh": "RelativeHumidity",
-        }
-    )
+    # The file is read once and reused by all files of the same day
+    mtime_ns = path.stat().st_mtime_ns
 
-    # Filter for the correct time
-    mask = (rs["timestamp"] >= time_start) & (
-        rs["timestamp"] < time_start + timedelta(minutes=59)
-    )
-    rs = rs.loc[mask]
+    # Use every sounding within the hour, looking up the day's few timestamps instead of
+    # scanning all of its rows
+    window_end = time_start + timedelta(minutes=59)
+    profiles = read_wrf_profiles(path, mtime_ns)
+    timestamps = [t for t in profiles if time_start <= t < window_end]
 
-    rs_timestamp = rs["timestamp"].iloc[0]
-    return (
-        rs_timestamp,
-        rs.loc[:, ["Altitude", "Temperature", "Pressure", "RelativeHumidity"]],
-    )
+    rs_timestamp = timestamps[0]
+    if len(timestamps) == 1:
+        return rs_timestamp, profiles[rs_timestamp]
+    return rs_timestamp, pd.concat([profiles[t] for t in timestamps])
@@ -9,19 +9,16 @@ from pathlib import Path
 import time
 
 from cleo import Command
-import pandas as pd
 from rich.panel import Panel
 from rich.markdown import Markdown
 from rich.table import Table
 from rich.progress import Progress, track
-from netCDF4 import Dataset
 
 from pollyxt_pipelines.console import console
 from pollyxt_pipelines import locations
 from pollyxt_pipelines.scc_access import scc_session, SCC, SCC_Credentials, exceptions
 from pollyxt_pipelines.config import Config, config_paths, print_login_error
 from pollyxt_pipelines.utils import option_to_bool
-from pollyxt_pipelines.qc_eldec import qc_eldec_file
 from pollyxt_pipelines.scc_access.types import ProductStatus
 
 
@@ -97,10 +94,14 @@ class UploadFiles(Command):
     """
 
     def handle(self):
+        import pandas as pd
+        from netCDF4 import Dataset
+        from pollyxt_pipelines.polly_to_scc.pollyxt import iter_netcdf_files
+
         # Parse arguments
         path = Path(self.argument("path"))
         if path.is_dir():
-            files = path.glob("*.nc")
+            files = iter_netcdf_files(path)
             files = filter(lambda x: not x.name.startswith("rs_"), files)
             if self.option("no-calibration"):
                 files = filter(lambda x: not x.name.startswith("calibration_"), files)
@@ -190,6 +191,8 @@ class DownloadFiles(Command):
     """
 
     def handle(self):
+        import pandas as pd
+
         # Check output directory
         output_directory = Path(self.argument("output-directory"))
         output_directory.mkdir(parents=True, exist_ok=True)
@@ -367,7 +370,7 @@ class SearchSCC(Command):
         location_name = self.option("location")
         location = None
         if location_name is not None:
-            location = locations.LOCATIONS[location_name]
+            location = locations.get_locations()[location_name]
             if location is None:
                 locations.unknown_location_error(location_name)
                 return 1
@@ -527,7 +530,7 @@ class SearchDownloadSCC(Command):
         location_name = self.option("location")
         location = None
         if location_name is not None:
-            location = locations.LOCATIONS[location_name]
+            location = locations.get_locations()[location_name]
             if location is None:
                 locations.unknown_location_error(location_name)
                 return 1
@@ -603,14 +606,12 @@ class SearchDownloadSCC(Command):
             # Download files
             measurement_count = len(measurements)
             file_count = 0
-            i = 0
             with Progress(console=console) as progress:
                 task = progress.add_task(
-                    f"Downloading products (1/{measurement_count})...",
-                    total=measurement_count,
+                    "Downloading products...", total=measurement_count
                 )
 
-                for m in measurements:
+                for i, m in enumerate(measurements, start=1):
                     progress.update(
                         task,
                         description=f"Downloading products ({i}/{measurement_count})...",
@@ -626,7 +627,6 @@ class SearchDownloadSCC(Command):
                             f"[error]Measurement[/error] {m.id} [error]has no products, skipping[/error]"
                         )
                     progress.advance(task)
-                    i += 1
 
         console.log(f"[info]Downloaded[/info] {file_count} [info]files![/info]")
 
@@ -647,7 +647,7 @@ class LidarConstantsSCC(Command):
         location_name = self.option("location")
         location = None
         if location_name is not None:
-            location = locations.LOCATIONS[location_name]
+            location = locations.get_locations()[location_name]
             if location is None:
                 locations.unknown_location_error(location_name)
                 return 1
@@ -748,6 +748,10 @@ class AutoUploadCalibration(Command):
     """
 
     def handle(self):
+        from netCDF4 import Dataset
+
+        from pollyxt_pipelines.qc_eldec import qc_eldec_file
+
         # Parse arguments
         path = self.argument("path")
         path = Path(path)
@@ -756,7 +760,7 @@ class AutoUploadCalibration(Command):
             return 1
 
         location_name = self.argument("location")
-        location = locations.LOCATIONS.get(location_name, None)
+        location = locations.get_locations().get(location_name, None)
         if location is None:
             locations.unknown_location_error(location_name)
             return 1
@@ -865,10 +869,11 @@ class AutoUploadCalibration(Command):
             # Run QC check
             eldec_files = list((temp_path / measurement_id).glob("*_eldec_v*.nc"))
             console.print(f"[info]Found {len(eldec_files)} ELDEC files[/info]")
+            plot_path = self.option("plot")
             for eldec_file in eldec_files:
                 console.print(f"Running QC check on {eldec_file.name}...")
                 eldec = qc_eldec_file.ELDECfile(
-                    eldec_file, location, plot_path=self.option("plot")
+                    eldec_file, location, plot_path=plot_path
                 )
 
                 # Delete calibration file in case of bad QC check
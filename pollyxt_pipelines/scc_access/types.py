@@ -2,7 +2,7 @@
 Various container classes and utility functions for handling SCC responses
 """
 
-from typing import Dict, Any, NamedTuple, Union
+from typing import Dict, Any, Union
 from enum import Enum, auto
 
 from datetime import datetime
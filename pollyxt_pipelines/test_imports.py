@@ -0,0 +1,33 @@
+import subprocess
+import sys
+
+
+def imported_modules(statement: str) -> set:
+    """
+    Runs `statement` in a fresh interpreter and returns the names of all modules
+    imported afterwards
+    """
+
+    result = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            f"import sys; {statement}; print(' '.join(sys.modules))",
+        ],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return set(result.stdout.split())
+
+
+def test_package_import_is_light():
+    """
+    Importing the package should not read distribution metadata or load the commands
+    """
+
+    modules = imported_modules("import pollyxt_pipelines")
+
+    assert "importlib.metadata" not in modules
+    assert "cleo" not in modules
+    assert "pollyxt_pipelines.polly_to_scc.commands" not in modules
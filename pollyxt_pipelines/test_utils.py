@@ -2,7 +2,13 @@ from datetime import datetime
 
 import pytest
 
-from pollyxt_pipelines.utils import date_option_to_datetime
+from pollyxt_pipelines.utils import (
+    csv_to_ints,
+    date_option_to_datetime,
+    ints_to_csv,
+    parse_date_option,
+    parse_into_string_or_integer_list,
+)
 
 
 class TestDateOptionToDatetime:
@@ -85,3 +91,40 @@ class TestDateOptionToDatetime:
         # Bad minute value (:70)
         with pytest.raises(ValueError):
             date_option_to_datetime(measurement_start, "XX:70")
+
+    def test_parsed_option(self):
+        measurement_start = datetime.strptime("2020-01-01_01:23", "%Y-%m-%d_%H:%M")
+
+        for string in ["2022-02-10_10:34", "12:00:34", "12:00", "XX:02"]:
+            option = parse_date_option(string)
+
+            assert date_option_to_datetime(
+                measurement_start, option
+            ) == date_option_to_datetime(measurement_start, string)
+
+
+class TestCommaSeparatedValues:
+    """
+    Tests for the utils.csv_to_ints() and utils.parse_into_string_or_integer_list() functions
+    """
+
+    def test_ints_to_csv(self):
+        assert ints_to_csv([0, 1, 249]) == "0, 1, 249"
+        assert ints_to_csv([]) == ""
+        assert csv_to_ints(ints_to_csv([3, 2, 1])) == [3, 2, 1]
+
+    def test_csv_to_ints(self):
+        assert csv_to_ints("0, 1,2 ,  249") == [0, 1, 2, 249]
+
+        with pytest.raises(ValueError):
+            csv_to_ints("1, two")
+
+    def test_integer_list(self):
+        assert parse_into_string_or_integer_list("1266, 1268") == [1266, 1268]
+
+    def test_string_list(self):
+        assert parse_into_string_or_integer_list("no000, 12 ") == ["no000", "12"]
+        assert parse_into_string_or_integer_list("-1, 2") == ["-1", "2"]
+
+    def test_none(self):
+        assert parse_into_string_or_integer_list(None) is None
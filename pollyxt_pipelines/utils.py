@@ -1,8 +1,7 @@
 """Various helper functions that fit nowhere"""
 
-from typing import List, Union, Optional
+from typing import List, Tuple, Union, Optional
 from datetime import datetime, timedelta
-import re
 
 
 def bool_to_emoji(x: bool) -> str:
@@ -53,64 +52,110 @@ def ints_to_csv(arr: List[int]) -> str:
     """
     Convert a list of `int` to a string with comma separated values
     """
-    return ", ".join(ints_to_strs(arr))
+    return ", ".join(map(str, arr))
 
 
-def date_option_to_datetime(today: datetime, string: str) -> datetime:
+def csv_to_ints(text: str) -> List[int]:
     """
-    Given a datetime and a string, this function will do one of the following:
-        - If the `string` contains only time info (in HH:MM or HH:MM:SS format), the function will return `today` with the hours
-          and minutes set to the values from `string`.
-        - If `string` contains both date and time (in YYYY-mm-DD HH:MM or YYYY-mm-DD HH:MM:SS format),
+    Convert a string with comma separated values to a list of `int`.
+    Whitespace around each value is ignored.
+    """
+    # int() already ignores surrounding whitespace, no need to strip each value
+    return [int(x) for x in text.split(",")]
+
+
+DateOption = Union[datetime, Tuple[int, ...], int]
+"""
+A parsed `--start-time`/`--end-time` option: a full timestamp, a time of day as (hour, minute) or
+(hour, minute, second) or only the minutes (from the XX:MM format).
+"""
+
+_DATE_OPTION_FORMATS = {
+    len("2020-01-01_00:00:00"): "%Y-%m-%d_%H:%M:%S",
+    len("2020-01-01_00:00"): "%Y-%m-%d_%H:%M",
+    len("00:00:00"): "%H:%M:%S",
+    len("00:00"): "%H:%M",
+}
+
+
+def parse_date_option(string: str) -> DateOption:
+    """
+    Parses a date/time command line option, without resolving it against any measurement. Use this
+    to validate the option early, and `date_option_to_datetime()` to get the actual timestamp.
+
+    Args:
+        string: Minutes in "XX:MM", time in "HH:MM(:SS)" or date and time in "YYYY-mm-DD_HH:MM(:SS)"
+
+    Returns:
+        A datetime if `string` contains a date, a tuple if it contains only the time of day or the
+        minutes as an int for the XX:MM format.
+
+    Throws:
+        ValueError: When the string is not in an acceptable format
+    """
+
+    if string.startswith("XX:"):
+        minute = string[3:]
+        if len(minute) == 2 and minute.isdecimal() and int(minute) < 60:
+            return int(minute)
+    else:
+        # The formats have different lengths, so the length decides which one to try
+        format = _DATE_OPTION_FORMATS.get(len(string))
+        if format is not None:
+            try:
+                parsed = datetime.strptime(string, format)
+            except ValueError:
+                pass
+            else:
+                if "%Y" in format:
+                    return parsed
+                elif "%S" in format:
+                    return parsed.hour, parsed.minute, parsed.second
+                else:
+                    return parsed.hour, parsed.minute
+
+    raise ValueError("`string` is neither in XX:MM, HH:MM nor YYYY-mm-DD HH:MM format!")
+
+
+def date_option_to_datetime(
+    today: datetime, option: Union[str, DateOption]
+) -> datetime:
+    """
+    Given a datetime and a date/time option, this function will do one of the following:
+        - If the option contains only time info (in HH:MM or HH:MM:SS format), the function will return `today` with the hours
+          and minutes set to the values from the option.
+        - If the option contains both date and time (in YYYY-mm-DD HH:MM or YYYY-mm-DD HH:MM:SS format),
           the function will return this as a datetime object. The `today` object will be ignored
+        - If the option contains only minutes (in XX:MM format), the function will return the first time after `today` with
+          these minutes.
     This function is used to parse command line options that allow the user to input either time or date and time when
     trimming files.
 
     Args:
-        today: A date to use if `string` contains only time information.
-        string: Time in "HH:MM" or date and time in "YYYY-mm-DD HH:MM"
+        today: A date to use if the option contains only time information.
+        option: The option as a string, or as already parsed by `parse_date_option()`
 
     Returns:
-        The string parsed as a datetime object
+        The option as a datetime object
 
     Throws:
         ValueError: When the string is not in an acceptable format
     """
 
-    # Try to determine the string's format
-    date_seconds_match = re.search(
-        r"^\d{4}-[01]\d-[0123]\d_[012]\d:[0-5]\d:[0-5]\d", string
-    )
-    if date_seconds_match is not None:
-        # Strings seems to be in YYYY-mm-DD HH:MM:SS format
-        return datetime.strptime(string, "%Y-%m-%d_%H:%M:%S")
-
-    date_match = re.search(r"^\d{4}-[01]\d-[0123]\d_[012]\d:[0-5]\d", string)
-    if date_match is not None:
-        # String seems to be in YYYY-mm-DD HH:MM format
-        return datetime.strptime(string, "%Y-%m-%d_%H:%M")
-
-    time_seconds_match = re.search(r"^[012]\d:[0-5]\d:[0-5]\d", string)
-    if time_seconds_match is not None:
-        # String seems to be in HH:MM:SS format, replace in `today` and return
-        hour, minute, second = [int(x) for x in string.split(":")]
-        return today.replace(hour=hour, minute=minute, second=second)
-
-    time_match = re.search(r"^[012]\d:[0-5]\d", string)
-    if time_match is not None:
-        # String is only time, replace in `today` and return
-        hour, minute = [int(x) for x in string.split(":")]
-        return today.replace(hour=hour, minute=minute)
-
-    minutes_match = re.search(r"^XX:[0-5]\d$", string)
-    if minutes_match is not None:
-        minute = int(string[-2:])
-        if today.replace(minute=minute) < today:
-            return (today + timedelta(hours=1)).replace(minute=minute)
-        else:
-            return today.replace(minute=minute)
+    if isinstance(option, str):
+        option = parse_date_option(option)
 
-    raise ValueError("`string` is neither in XX:MM, HH:MM nor YYYY-mm-DD HH:MM format!")
+    if isinstance(option, datetime):
+        return option
+
+    if isinstance(option, tuple):
+        return today.replace(**dict(zip(("hour", "minute", "second"), option)))
+
+    # Only minutes, use the first occurrence after `today`
+    if today.replace(minute=option) < today:
+        return (today + timedelta(hours=1)).replace(minute=option)
+    else:
+        return today.replace(minute=option)
 
 
 def parse_into_string_or_integer_list(
@@ -126,7 +171,8 @@ def parse_into_string_or_integer_list(
         return None
 
     values = [x.strip() for x in text_values.split(",")]
-    if all([re.match(r"^\d+$", x) for x in values]):
+    # `str.isdecimal()` accepts the same characters as `\d`
+    if all(x.isdecimal() for x in values):
         return [int(x) for x in values]
     else:
         return values